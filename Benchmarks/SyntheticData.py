@@ -0,0 +1,217 @@
+from __future__ import annotations
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, TextIO, Tuple
+
+import csv
+import json
+import os
+import random
+
+
+class SyntheticData:
+    """
+    Generates reproducible KMyMoney ledgers, brokerage dividend exports and the
+    matching config.json for benchmarking.
+
+    Every ledger has a fixed set of securities; a third of its transactions are
+    dividends on the benchmark portfolio accounts, the rest are plain 2-split
+    cash movements so duplicate detection has non-matching noise to skip.
+    Export rows are drawn so that `duplicate_ratio` of them already exist in the ledger.
+    """
+
+    PORTFOLIO_NAME = "BenchRRSP"
+    CASH_ACCOUNT_ID = "A000001"
+    INCOME_ACCOUNT_ID = "A000002"
+    OTHER_ACCOUNT_ID = "A000003"
+    SECURITY_COUNT = 50
+    START_DATE = date(2000, 1, 1)
+
+    def __init__(self, seed: int = 42) -> None:
+        self._seed = seed
+
+    def tickers(self) -> List[str]:
+        return [f"TK{i:03d}" for i in range(self.SECURITY_COUNT)]
+
+    def security_account_id(self, index: int) -> str:
+        return f"A{100000 + index:06d}"
+
+    def write_config(self, path: str) -> None:
+        config = {
+            "portfolios": [
+                {
+                    "name": self.PORTFOLIO_NAME,
+                    "filename_contains": self.PORTFOLIO_NAME,
+                    "brokerage_cash_account_id": self.CASH_ACCOUNT_ID,
+                    "income_gain_account_id": self.INCOME_ACCOUNT_ID,
+                    "ticker_to_security_account_id": {
+                        ticker: self.security_account_id(i)
+                        for i, ticker in enumerate(self.tickers())
+                    },
+                }
+            ]
+        }
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+
+    def write_ledger(self, path: str, transaction_count: int) -> None:
+        """
+        Streams the ledger to disk so even the 1M-transaction file is generated in flat memory.
+        """
+        rng = random.Random(self._seed)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+            f.write("<!DOCTYPE KMYMONEY-FILE>\n")
+            f.write("<KMYMONEY-FILE>\n")
+            self._write_reference_data(f)
+            f.write(f'  <TRANSACTIONS count="{transaction_count}">\n')
+
+            for number in range(1, transaction_count + 1):
+                if number % 3 == 0:
+                    self._write_dividend_transaction(f, number, *self._ledger_dividend(rng, number))
+                else:
+                    self._write_transfer_transaction(f, number, rng)
+
+            f.write("  </TRANSACTIONS>\n")
+            f.write('  <PRICES count="0"/>\n')
+            f.write("</KMYMONEY-FILE>\n")
+
+    def write_csv_export(self, path: str, ledger_transaction_count: int, row_count: int,
+                         duplicate_ratio: float = 0.5) -> None:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Transaction Date", "Symbol", "Description", "Net Amount", "Currency"])
+
+            for trans_date, ticker, amount in self._export_rows(ledger_transaction_count, row_count, duplicate_ratio):
+                writer.writerow([trans_date.isoformat(), ticker, "Dividend", f"{amount:.2f}", "CAD"])
+
+    def write_xlsx_export(self, path: str, ledger_transaction_count: int, row_count: int,
+                          duplicate_ratio: float = 0.5) -> None:
+        # Imported here so CSV-only benchmark runs do not need openpyxl
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append(["Transaction Date", "Symbol", "Description", "Net Amount", "Currency"])
+
+        for trans_date, ticker, amount in self._export_rows(ledger_transaction_count, row_count, duplicate_ratio):
+            worksheet.append([trans_date, ticker, "Dividend", float(amount), "CAD"])
+
+        workbook.save(path)
+
+    def ensure_files(self, work_dir: str, transaction_count: int, row_count: int,
+                     input_format: str) -> Tuple[str, str, str]:
+        """
+        Returns (ledger path, export path, config path), generating whatever is missing.
+        Files are cached by size in work_dir since the large ledgers take a while to write.
+        """
+        os.makedirs(work_dir, exist_ok=True)
+
+        ledger_path = os.path.join(work_dir, f"ledger_{transaction_count}.xml")
+        export_path = os.path.join(
+            work_dir,
+            f"{self.PORTFOLIO_NAME}_{transaction_count}_{row_count}.{input_format}",
+        )
+        config_path = os.path.join(work_dir, "config.json")
+
+        if not os.path.exists(ledger_path):
+            self.write_ledger(ledger_path, transaction_count)
+
+        if not os.path.exists(export_path):
+            if input_format == "xlsx":
+                self.write_xlsx_export(export_path, transaction_count, row_count)
+            else:
+                self.write_csv_export(export_path, transaction_count, row_count)
+
+        if not os.path.exists(config_path):
+            self.write_config(config_path)
+
+        return ledger_path, export_path, config_path
+
+    def _ledger_dividend(self, rng: random.Random, number: int) -> Tuple[date, int, Decimal]:
+        trans_date = self.START_DATE + timedelta(days=number // 3 % 9000)
+        security_index = (number // 3) % self.SECURITY_COUNT
+        amount = Decimal(rng.randint(1, 500000)) / Decimal(100)
+        return trans_date, security_index, amount
+
+    def _export_rows(self, ledger_transaction_count: int, row_count: int,
+                     duplicate_ratio: float) -> List[Tuple[date, str, Decimal]]:
+        # Replay the ledger generator to know which dividends already exist
+        ledger_rng = random.Random(self._seed)
+        existing: List[Tuple[date, int, Decimal]] = []
+        for number in range(1, ledger_transaction_count + 1):
+            if number % 3 == 0:
+                existing.append(self._ledger_dividend(ledger_rng, number))
+            else:
+                self._transfer_values(ledger_rng)
+
+        rng = random.Random(self._seed + 1)
+        tickers = self.tickers()
+        rows: List[Tuple[date, str, Decimal]] = []
+
+        for i in range(row_count):
+            if existing and rng.random() < duplicate_ratio:
+                trans_date, security_index, amount = existing[rng.randrange(len(existing))]
+            else:
+                # New dividends are dated after the ledger so they can never collide
+                trans_date = date(2030, 1, 1) + timedelta(days=i % 3000)
+                security_index = rng.randrange(self.SECURITY_COUNT)
+                amount = Decimal(rng.randint(1, 500000)) / Decimal(100)
+
+            rows.append((trans_date, tickers[security_index], amount))
+
+        return rows
+
+    def _write_reference_data(self, f: TextIO) -> None:
+        f.write('  <CURRENCIES count="1">\n')
+        f.write('    <CURRENCY id="CAD" name="Canadian Dollar" symbol="$" type="3" saf="100" pp="100" scf="100"'
+                ' rounding-method="7"/>\n')
+        f.write("  </CURRENCIES>\n")
+
+        f.write(f'  <SECURITIES count="{self.SECURITY_COUNT}">\n')
+        for i, ticker in enumerate(self.tickers()):
+            f.write(f'    <SECURITY id="E{i + 1:06d}" name="Security {ticker}" symbol="{ticker}" type="0"'
+                    f' saf="100" pp="4" scf="100" trading-currency="CAD" rounding-method="7"/>\n')
+        f.write("  </SECURITIES>\n")
+
+        f.write(f'  <ACCOUNTS count="{self.SECURITY_COUNT + 3}">\n')
+        f.write(f'    <ACCOUNT id="{self.CASH_ACCOUNT_ID}" name="Brokerage cash" currency="CAD" type="1"/>\n')
+        f.write(f'    <ACCOUNT id="{self.INCOME_ACCOUNT_ID}" name="Dividends" currency="CAD" type="12"/>\n')
+        f.write(f'    <ACCOUNT id="{self.OTHER_ACCOUNT_ID}" name="Chequing" currency="CAD" type="1"/>\n')
+        for i in range(self.SECURITY_COUNT):
+            f.write(f'    <ACCOUNT id="{self.security_account_id(i)}" name="Holding {i}" currency="E{i + 1:06d}"'
+                    f' type="15"/>\n')
+        f.write("  </ACCOUNTS>\n")
+
+    def _write_dividend_transaction(self, f: TextIO, number: int, trans_date: date,
+                                    security_index: int, amount: Decimal) -> None:
+        cents = int(amount * 100)
+        f.write(f'    <TRANSACTION id="T{number:018d}" postdate="{trans_date.isoformat()}" memo="Dividend"'
+                f' commodity="CAD" entrydate="2020-01-01T00:00:00" modified="2020-01-01T00:00:00">\n')
+        f.write("      <SPLITS>\n")
+        f.write(f'        <SPLIT id="S0001" account="{self.CASH_ACCOUNT_ID}" value="{cents}/100"'
+                f' shares="{cents}/100" memo="Dividend"/>\n')
+        f.write(f'        <SPLIT id="S0002" account="{self.security_account_id(security_index)}" value="0/1"'
+                f' shares="0/1" action="Dividend" memo="Dividend"/>\n')
+        f.write(f'        <SPLIT id="S0003" account="{self.INCOME_ACCOUNT_ID}" value="-{cents}/100"'
+                f' shares="-{cents}/100" memo="Dividend"/>\n')
+        f.write("      </SPLITS>\n")
+        f.write("    </TRANSACTION>\n")
+
+    def _transfer_values(self, rng: random.Random) -> Tuple[int, int]:
+        return rng.randint(0, 9000), rng.randint(1, 1000000)
+
+    def _write_transfer_transaction(self, f: TextIO, number: int, rng: random.Random) -> None:
+        day_offset, cents = self._transfer_values(rng)
+        trans_date = self.START_DATE + timedelta(days=day_offset)
+        f.write(f'    <TRANSACTION id="T{number:018d}" postdate="{trans_date.isoformat()}" memo="Transfer"'
+                f' commodity="CAD" entrydate="2020-01-01T00:00:00" modified="2020-01-01T00:00:00">\n')
+        f.write("      <SPLITS>\n")
+        f.write(f'        <SPLIT id="S0001" account="{self.CASH_ACCOUNT_ID}" value="{cents}/100"'
+                f' shares="{cents}/100" memo=""/>\n')
+        f.write(f'        <SPLIT id="S0002" account="{self.OTHER_ACCOUNT_ID}" value="-{cents}/100"'
+                f' shares="-{cents}/100" memo=""/>\n')
+        f.write("      </SPLITS>\n")
+        f.write("    </TRANSACTION>\n")
@@ -0,0 +1,269 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Same layout as the launcher scripts: the importer package lives under Src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Src"))
+
+from Importer.AppConfig import AppConfig  # noqa: E402
+from Importer.DividendImporter import DividendImporter  # noqa: E402
+from Importer.DividendReaderFactory import DividendReaderFactory  # noqa: E402
+from Importer.KmymoneyXml import KmymoneyXml  # noqa: E402
+from Importer.KmymoneyXmlBackend import KmymoneyXmlBackend  # noqa: E402
+from Importer.Model.DividendInsert import DividendInsert  # noqa: E402
+from Importer.Model.ImportOptions import ImportOptions  # noqa: E402
+
+from SyntheticData import SyntheticData  # noqa: E402
+
+
+class StageRecorder:
+    """
+    Times one benchmark stage at a time and optionally records its peak traced memory.
+    """
+
+    def __init__(self, trace_memory: bool) -> None:
+        self._trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str, unit: str, items: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        The yielded dict lets a stage report its item count once it knows it.
+        """
+        stats: Dict[str, Any] = {"items": items}
+
+        if self._trace_memory:
+            tracemalloc.start()
+
+        peak_bytes: Optional[int] = None
+        try:
+            started = time.perf_counter()
+            yield stats
+            elapsed = time.perf_counter() - started
+
+            if self._trace_memory:
+                _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            # A failing stage must not leave tracing on for the stages after it
+            if self._trace_memory:
+                tracemalloc.stop()
+
+        items = stats["items"]
+        self.stages[name] = {
+            "seconds": elapsed,
+            "items": items,
+            "unit": unit,
+            "throughput_per_second": items / elapsed if elapsed > 0 else None,
+            "peak_traced_bytes": peak_bytes,
+        }
+
+
+def memory_traceable(backend: str) -> bool:
+    """
+    tracemalloc only sees allocations made through Python; lxml builds its trees
+    in C, so its peaks would read close to 0 MiB.
+    """
+    return KmymoneyXmlBackend.create(backend).name != "lxml"
+
+
+def run_case(ledger_path: str, export_path: str, config_path: str, out_dir: str,
+             trace_memory: bool, backend: str) -> Dict[str, Dict[str, Any]]:
+    cfg = AppConfig.load(config_path)
+    portfolio = cfg.portfolio_for_input_filename(os.path.basename(export_path))
+    recorder = StageRecorder(trace_memory)
+
+    reader = DividendReaderFactory.create_for_path(export_path)
+    rows: List[Any] = []
+    with recorder.stage("reader_parse", "rows") as stats:
+        rows = list(reader.iter_rows(export_path))
+        stats["items"] = len(rows)
+
+    ledger_bytes = os.path.getsize(ledger_path)
+    kmymoney: Optional[KmymoneyXml] = None
+    with recorder.stage("ledger_load", "bytes", ledger_bytes):
+        kmymoney = KmymoneyXml(ledger_path, backend=backend)
+
+    mapped = [
+        (row, portfolio.security_account_for_ticker(row.ticker))
+        for row in rows
+    ]
+    mapped = [(row, account_id) for row, account_id in mapped if account_id is not None]
+
+    new_rows: List[Any] = []
+    with recorder.stage("duplicate_checks", "rows", len(mapped)):
+        for row, security_account_id in mapped:
+            if not kmymoney.has_duplicate_dividend(
+                postdate=row.trans_date.isoformat(),
+                security_account_id=security_account_id,
+                amount=row.amount,
+                cash_account_id=portfolio.brokerage_cash_account_id,
+                commodity_id=row.currency,
+            ):
+                new_rows.append((row, security_account_id))
+
+    # Allocated on a scanned copy of the ledger, so add_transactions below still
+    # hands out the first ids and the output ledgers have no gap
+    with recorder.stage("ledger_scan", "bytes", ledger_bytes):
+        scanned = KmymoneyXml(ledger_path, backend=backend, scan_only=True)
+
+    with recorder.stage("id_allocation", "ids", len(new_rows)):
+        scanned.allocate_transaction_ids(len(new_rows))
+    scanned = None
+
+    inserts = [
+        DividendInsert(
+            row=row,
+            cash_account_id=portfolio.brokerage_cash_account_id,
+            security_account_id=security_account_id,
+            income_account_id=portfolio.income_gain_account_id,
+        )
+        for row, security_account_id in new_rows
+    ]
+    with recorder.stage("add_transactions", "transactions", len(inserts)):
+        kmymoney.add_dividend_transactions(inserts)
+
+    with recorder.stage("save_splice", "bytes", ledger_bytes):
+        kmymoney.save(os.path.join(out_dir, "out_splice.xml"), splice=True)
+
+    with recorder.stage("save_full", "bytes", ledger_bytes):
+        kmymoney.save(os.path.join(out_dir, "out_full.xml"))
+
+    kmymoney = None
+
+    importer = DividendImporter(cfg)
+    with recorder.stage("end_to_end", "rows", len(rows)):
+        importer.import_dividends(
+            xml_path=ledger_path,
+            input_path=export_path,
+            out_path=os.path.join(out_dir, "out_end_to_end.xml"),
+            options=ImportOptions(xml_backend=backend),
+        )
+
+    return recorder.stages
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    baseline_cases = {
+        (case["transactions"], case["rows"], case["format"], case.get("backend", "stdlib")): case
+        for case in (baseline or {}).get("cases", [])
+    }
+
+    for case in results["cases"]:
+        key = (case["transactions"], case["rows"], case["format"], case["backend"])
+        previous = baseline_cases.get(key)
+        print(f"ledger={case['transactions']:>9} tx  input={case['rows']} {case['format']} rows"
+              f"  backend={case['backend']}")
+
+        for name, stage in case["stages"].items():
+            line = f"  {name:<18} {stage['seconds']:>10.4f}s"
+            if stage["throughput_per_second"] is not None:
+                line += f"  {stage['throughput_per_second']:>14,.0f} {stage['unit']}/s"
+            if stage["peak_traced_bytes"] is not None:
+                line += f"  peak {stage['peak_traced_bytes'] / (1024 * 1024):>9.1f} MiB"
+            elif results["memory_traced"] and not case["memory_traced"]:
+                line += "  peak     untracked"
+            if previous is not None and name in previous["stages"] and previous["stages"][name]["seconds"] > 0:
+                ratio = stage["seconds"] / previous["stages"][name]["seconds"]
+                line += f"  ({ratio:.2f}x vs baseline)"
+            print(line)
+
+
+def main() -> None:
+    """
+    Example usage (from the repository root):
+      python Benchmarks/benchmark.py --sizes 1000 10000 --rows 2000 --out bench.json
+      python Benchmarks/benchmark.py --compare bench.json --out bench_new.json
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the dividend import pipeline on synthetic data.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000, 1000000],
+        help="Ledger sizes (number of transactions) to generate and benchmark",
+    )
+    parser.add_argument("--rows", type=int, default=5000, help="Rows in the generated dividend export")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv", help="Dividend export format")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["auto", "lxml", "stdlib"],
+        default=["stdlib"],
+        help="KmymoneyXml backends to benchmark (pass 'stdlib lxml' to compare them)",
+    )
+    parser.add_argument("--work-dir", default="bench_data", help="Where generated files are cached")
+    parser.add_argument("--out", default="bench_results.json", help="Machine-readable results file")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip tracemalloc peak-memory tracking (it slows every stage down)",
+    )
+    args = parser.parse_args()
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    data = SyntheticData()
+    cases: List[Dict[str, Any]] = []
+
+    for size in args.sizes:
+        ledger_path, export_path, config_path = data.ensure_files(args.work_dir, size, args.rows, args.format)
+
+        for backend in args.backends:
+            memory_traced = not args.no_memory and memory_traceable(backend)
+            stages = run_case(ledger_path, export_path, config_path, args.work_dir, memory_traced, backend)
+            cases.append({
+                "transactions": size,
+                "rows": args.rows,
+                "format": args.format,
+                "backend": backend,
+                "memory_traced": memory_traced,
+                "ledger_bytes": os.path.getsize(ledger_path),
+                "stages": stages,
+            })
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "memory_traced": not args.no_memory,
+        "cases": cases,
+    }
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print_report(results, baseline)
+    print(f"Results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,38 @@ from typing import List, Optional
 
 import json
 
+from Importer.AppConfigCache import AppConfigCache
 from Importer.Model.PortfolioMapping import PortfolioMapping
+from Importer.PortfolioFilenameMatcher import PortfolioFilenameMatcher
 
 
 class AppConfig:
-    def __init__(self, portfolios: List[PortfolioMapping]) -> None:
+    def __init__(self, portfolios: List[PortfolioMapping], filename_matcher: PortfolioFilenameMatcher) -> None:
         # Rule 4: constructor only assigns fields
         self._portfolios: List[PortfolioMapping] = portfolios
+        self._filename_matcher = filename_matcher
 
     @staticmethod
-    def load(path: str) -> "AppConfig":
+    def from_portfolios(portfolios: List[PortfolioMapping]) -> "AppConfig":
+        return AppConfig(portfolios, PortfolioFilenameMatcher(portfolios))
+
+    @staticmethod
+    def load(path: str, *, use_cache: bool = False) -> "AppConfig":
         """
         Factory method responsible for:
         - Reading config file
         - Parsing JSON
-        - Building domain objects
+        - Building domain objects and the filename matcher
+
+        With use_cache=True the built config is also kept in a binary sidecar
+        (see AppConfigCache) and reused until config.json changes.
         """
+        cache = AppConfigCache() if use_cache else None
+        if cache is not None:
+            cached = cache.load(path)
+            if cached is not None:
+                return cached
+
         with open(path, "r", encoding="utf-8") as f:
             raw = json.load(f)
 
@@ -38,15 +54,21 @@ class AppConfig:
                 )
             )
 
-        return AppConfig(portfolios)
+        cfg = AppConfig.from_portfolios(portfolios)
+
+        if cache is not None:
+            cache.store(path, cfg)
+
+        return cfg
+
+    @property
+    def portfolios(self) -> List[PortfolioMapping]:
+        return list(self._portfolios)
 
     def portfolio_for_input_filename(self, filename: str) -> Optional[PortfolioMapping]:
         """
-        Returns the first portfolio mapping matching the CSV filename,
-        or None if no match exists.
+        Returns the portfolio mapping with the longest filename_contains found in
+        the filename, or None if no match exists. Raises ValueError if several
+        portfolios match equally well.
         """
-        for portfolio in self._portfolios:
-            if portfolio.match_for_filename(filename):
-                return portfolio
-
-        return None
+        return self._filename_matcher.match(filename)
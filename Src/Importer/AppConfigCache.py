@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+
+import logging
+import os
+import pickle
+
+from Importer.SidecarFile import SidecarFile
+
+if TYPE_CHECKING:
+    from Importer.AppConfig import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class AppConfigCache:
+    """
+    Keeps a fully built AppConfig (portfolios, normalized ticker tables and the
+    compiled filename matcher) in a pickle next to config.json
+    (<config>.cache.pickle), so batch runs skip JSON parsing and matcher construction.
+
+    An entry is only trusted while SidecarFile.is_current holds for config.json.
+    The sidecar is unpickled, so it must live somewhere only its owner can write,
+    like config.json itself.
+    """
+
+    SUFFIX = ".cache.pickle"
+    FORMAT_VERSION = 1
+
+    def sidecar_path(self, config_path: str) -> str:
+        return config_path + self.SUFFIX
+
+    def load(self, config_path: str) -> Optional["AppConfig"]:
+        sidecar_path = self.sidecar_path(config_path)
+        if not os.path.exists(sidecar_path):
+            return None
+
+        try:
+            with open(sidecar_path, "rb") as f:
+                raw = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning("Ignoring unreadable config cache %s: %s", sidecar_path, e)
+            return None
+
+        if not isinstance(raw, dict) or raw.get("version") != self.FORMAT_VERSION:
+            return None
+
+        if not SidecarFile.is_current(raw, config_path, description="Config cache"):
+            return None
+
+        return raw["config"]
+
+    def store(self, config_path: str, cfg: "AppConfig") -> None:
+        signature = SidecarFile.signature(config_path)
+        if signature is None:
+            logger.info("%s changed while it was hashed; not caching it", config_path)
+            return
+
+        raw = {
+            "version": self.FORMAT_VERSION,
+            **signature,
+            "config": cfg,
+        }
+
+        with SidecarFile.write(self.sidecar_path(config_path)) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(raw, f, protocol=pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DateParser:
+    """
+    Parses the date strings of one input file.
+
+    The file's format is detected once from a sample of its first rows and then
+    locked, so every row is parsed the same way (no mixing %d/%m and %m/%d inside
+    one file) and most rows cost a single parse attempt instead of a chain of
+    failing strptime calls. ISO dates take a date.fromisoformat fast path.
+    Rows that do not match the locked format fall back to the full list.
+    """
+
+    ISO_FORMAT = "%Y-%m-%d"
+
+    DATE_FORMATS: List[str] = [
+        ISO_FORMAT,
+        "%d/%m/%Y",
+        "%m/%d/%Y",
+        "%Y-%m-%d %I:%M:%S %p",
+    ]
+
+    # How many leading rows the readers hand to detect()
+    SAMPLE_SIZE = 50
+
+    def __init__(self) -> None:
+        self._locked_format: Optional[str] = None
+
+    @property
+    def locked_format(self) -> Optional[str]:
+        return self._locked_format
+
+    def detect(self, samples: Iterable[str]) -> Optional[str]:
+        """
+        Locks onto the first format (in DATE_FORMATS order) that parses the most samples.
+        Returns the chosen format, or None if no sample parsed at all.
+        """
+        values = [s.strip() for s in samples if s and s.strip()]
+
+        best_format: Optional[str] = None
+        best_count = 0
+
+        for date_format in self.DATE_FORMATS:
+            count = sum(1 for value in values if self._try_format(value, date_format) is not None)
+            if count > best_count:
+                best_format = date_format
+                best_count = count
+
+            if values and count == len(values):
+                break
+
+        self._locked_format = best_format
+        logger.debug("Detected date format %r from %d sample(s)", best_format, len(values))
+
+        return best_format
+
+    def parse(self, date_str: str) -> Optional[date]:
+        date_str = date_str.strip()
+        if not date_str:
+            return None
+
+        if self._locked_format is not None:
+            parsed = self._try_format(date_str, self._locked_format)
+            if parsed is not None:
+                return parsed
+
+        for date_format in self.DATE_FORMATS:
+            if date_format == self._locked_format:
+                continue
+
+            parsed = self._try_format(date_str, date_format)
+            if parsed is not None:
+                return parsed
+
+        return None
+
+    def _try_format(self, date_str: str, date_format: str) -> Optional[date]:
+        # fromisoformat is much cheaper than strptime; restrict it to the exact
+        # YYYY-MM-DD shape so it does not accept more than "%Y-%m-%d" would.
+        is_iso_shape = len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-"
+        if date_format == self.ISO_FORMAT and is_iso_shape:
+            try:
+                return date.fromisoformat(date_str)
+            except ValueError:
+                pass
+
+        try:
+            return datetime.strptime(date_str, date_format).date()
+        except ValueError:
+            return None
\ No newline at end of file
@@ -0,0 +1,234 @@
+from __future__ import annotations
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the pure-Python path gives the same totals
+    np = None
+
+from Importer.KmymoneyColumnCache import KmymoneyColumnCache
+from Importer.KmymoneyXml import KmymoneyXml
+from Importer.Model.DividendColumns import DividendColumns
+from Importer.Model.PortfolioMapping import PortfolioMapping
+
+logger = logging.getLogger(__name__)
+
+GroupKey = Tuple[str, ...]
+
+
+class DividendAnalytics:
+    """
+    Grouped dividend totals over DividendColumns.
+
+    A split counts for a portfolio when it is on the portfolio's brokerage cash
+    account and its transaction's 'Dividend' split is on one of the portfolio's
+    security accounts. Totals can be grouped by any of GROUP_KEYS; securities are
+    labelled with the portfolio's ticker for them.
+
+    With NumPy installed the columns are viewed in place and aggregated with
+    vectorized masks and bincounts; otherwise a single Python pass is used.
+    """
+
+    GROUP_KEYS = ("portfolio", "security", "year")
+
+    def __init__(self, columns: DividendColumns, portfolios: List[PortfolioMapping]) -> None:
+        # Rule 4: constructor only assigns fields
+        self._columns = columns
+        self._portfolios = portfolios
+
+    @staticmethod
+    def load_columns(xml_path: str, *, use_cache: bool = False, xml_backend: str = "auto") -> DividendColumns:
+        """
+        Extracts the ledger's DividendColumns, or with use_cache=True reuses the
+        KmymoneyColumnCache sidecar while the ledger is unchanged.
+        """
+        cache: Optional[KmymoneyColumnCache] = KmymoneyColumnCache() if use_cache else None
+
+        columns = cache.load(xml_path) if cache is not None else None
+        if columns is not None:
+            return columns
+
+        kmymoney = KmymoneyXml(xml_path, backend=xml_backend)
+        columns = kmymoney.dividend_columns()
+
+        if cache is not None:
+            cache.store(xml_path, columns, source_stat=kmymoney.source_stat)
+
+        return columns
+
+    def totals(self, group_by: Sequence[str]) -> List[Tuple[GroupKey, int]]:
+        """
+        Dividend totals in cents, as (key, cents) pairs sorted by key. key holds one
+        string per group_by entry, in the same order.
+        """
+        unknown = [key for key in group_by if key not in self.GROUP_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown group key(s): {', '.join(unknown)}. Supported: {', '.join(self.GROUP_KEYS)}")
+
+        selections = self._selections()
+        if "portfolio" not in group_by:
+            # Portfolios may share accounts: merge them so no split is counted twice
+            merged: Dict[int, Set[int]] = {}
+            for _, cash_number, security_numbers in selections:
+                merged.setdefault(cash_number, set()).update(security_numbers)
+            selections = [("", cash_number, security_numbers) for cash_number, security_numbers in merged.items()]
+
+        if np is not None:
+            totals = self._totals_numpy(selections, group_by)
+        else:
+            logger.debug("numpy not available, aggregating %d splits in Python", len(self._columns))
+            totals = self._totals_python(selections, group_by)
+
+        return sorted(totals.items())
+
+    def _selections(self) -> List[Tuple[str, int, Set[int]]]:
+        account_numbers = {account_id: number for number, account_id in enumerate(self._columns.account_ids)}
+        selections: List[Tuple[str, int, Set[int]]] = []
+
+        for portfolio in self._portfolios:
+            cash_number = account_numbers.get(portfolio.brokerage_cash_account_id)
+            security_numbers = {
+                account_numbers[account_id]
+                for account_id in portfolio.ticker_to_security_account_id.values()
+                if account_id in account_numbers
+            }
+            if cash_number is not None and security_numbers:
+                selections.append((portfolio.name, cash_number, security_numbers))
+
+        return selections
+
+    def _security_labels(self) -> Dict[Tuple[str, int], str]:
+        """
+        (portfolio name, security number) -> ticker; "" as portfolio name holds the
+        first ticker any portfolio uses for the account.
+        """
+        account_numbers = {account_id: number for number, account_id in enumerate(self._columns.account_ids)}
+        labels: Dict[Tuple[str, int], str] = {}
+
+        for portfolio in self._portfolios:
+            for ticker, account_id in sorted(portfolio.ticker_to_security_account_id.items()):
+                number = account_numbers.get(account_id)
+                if number is not None:
+                    labels.setdefault((portfolio.name, number), ticker)
+                    labels.setdefault(("", number), ticker)
+
+        return labels
+
+    def _key(
+        self,
+        group_by: Sequence[str],
+        portfolio_name: str,
+        security_number: int,
+        year: int,
+        labels: Dict[Tuple[str, int], str],
+    ) -> GroupKey:
+        parts = []
+
+        for key in group_by:
+            if key == "portfolio":
+                parts.append(portfolio_name)
+            elif key == "security":
+                parts.append(
+                    labels.get((portfolio_name, security_number), self._columns.account_ids[security_number])
+                )
+            else:
+                parts.append(str(year))
+
+        return tuple(parts)
+
+    def _totals_python(
+        self,
+        selections: List[Tuple[str, int, Set[int]]],
+        group_by: Sequence[str],
+    ) -> Dict[GroupKey, int]:
+        columns = self._columns
+        labels = self._security_labels()
+        by_cash: Dict[int, List[Tuple[str, Set[int]]]] = {}
+        for portfolio_name, cash_number, security_numbers in selections:
+            by_cash.setdefault(cash_number, []).append((portfolio_name, security_numbers))
+
+        sums: Dict[Tuple[str, int, int], int] = {}
+        years: Dict[int, int] = {}
+        with_year = "year" in group_by
+
+        for postdate, security_number, account_number, cents in zip(
+            columns.postdate, columns.security, columns.account, columns.cents
+        ):
+            candidates = by_cash.get(account_number)
+            if candidates is None:
+                continue
+
+            year = 0
+            if with_year:
+                year = years.get(postdate)
+                if year is None:
+                    year = years[postdate] = date.fromordinal(postdate).year
+
+            for portfolio_name, security_numbers in candidates:
+                if security_number in security_numbers:
+                    group = (portfolio_name, security_number if "security" in group_by else -1, year)
+                    sums[group] = sums.get(group, 0) + cents
+
+        totals: Dict[GroupKey, int] = {}
+        for (portfolio_name, security_number, year), cents in sums.items():
+            key = self._key(group_by, portfolio_name, security_number, year, labels)
+            totals[key] = totals.get(key, 0) + cents
+
+        return totals
+
+    def _totals_numpy(
+        self,
+        selections: List[Tuple[str, int, Set[int]]],
+        group_by: Sequence[str],
+    ) -> Dict[GroupKey, int]:
+        columns = self._columns
+        labels = self._security_labels()
+        postdate = np.frombuffer(columns.postdate, dtype=np.int64)
+        security = np.frombuffer(columns.security, dtype=np.int64)
+        account = np.frombuffer(columns.account, dtype=np.int64)
+        cents = np.frombuffer(columns.cents, dtype=np.int64)
+
+        first_year = 0
+        year_count = 1
+        if "year" in group_by and len(postdate):
+            # Dates span a few thousand days: map each ordinal in range to its year once
+            first_ordinal = int(postdate.min())
+            year_table = np.array(
+                [date.fromordinal(o).year for o in range(first_ordinal, int(postdate.max()) + 1)],
+                dtype=np.int64,
+            )
+            first_year = int(year_table[0])
+            year_count = int(year_table[-1]) - first_year + 1
+            year_offsets = year_table[postdate - first_ordinal] - first_year
+        else:
+            year_offsets = np.zeros(len(postdate), dtype=np.int64)
+
+        if "security" in group_by:
+            security_keys = security
+            security_count = len(columns.account_ids)
+        else:
+            security_keys = np.zeros(len(security), dtype=np.int64)
+            security_count = 1
+
+        totals: Dict[GroupKey, int] = {}
+
+        for portfolio_name, cash_number, security_numbers in selections:
+            mask = (account == cash_number) & np.isin(security, np.fromiter(security_numbers, dtype=np.int64))
+            if not mask.any():
+                continue
+
+            # Dense (security, year) codes: grouping becomes two bincounts, no sort.
+            # float64 weights stay exact for any realistic total (below 2**53 cents)
+            codes = security_keys[mask] * year_count + year_offsets[mask]
+            counts = np.bincount(codes, minlength=security_count * year_count)
+            sums = np.bincount(codes, weights=cents[mask], minlength=security_count * year_count)
+
+            for code in np.flatnonzero(counts).tolist():
+                security_number, year_offset = divmod(code, year_count)
+                key = self._key(group_by, portfolio_name, security_number, first_year + year_offset, labels)
+                totals[key] = totals.get(key, 0) + int(round(sums[code]))
+
+        return totals
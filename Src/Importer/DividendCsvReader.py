@@ -1,71 +1,140 @@
 from __future__ import annotations
-from datetime import datetime, date
+from datetime import date
 from decimal import Decimal
-from typing import Dict, List, Optional
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import csv
+import sys
+import logging
 
+from Importer.DateParser import DateParser
 from Importer.DividendReader import DividendReader
+from Importer.Model.CsvColumnPlan import CsvColumnPlan
 from Importer.Model.DividendRow import DividendRow
 
+logger = logging.getLogger(__name__)
+
 
 class DividendCsvReader(DividendReader):
     """
     Reads dividend lines from a CSV export.
 
-    You may need to adapt column names depending on your bank export:
+    You may need to adapt column names depending on your bank export.
+    Columns are looked up once from the header; on each row the first candidate
+    with a value wins (e.g. "Settlement Date" when "Transaction Date" is empty):
     - ticker/symbol: "Symbol" or "Ticker"
     - date: "Transaction Date" or "Settlement Date" or "Date"
     - amount: "Net Amount" or "Amount"
-    - description: "Description"
+    - description: "Description", falling back to "Action" on rows where it is empty
     """
 
-    def read(self, input_path: str) -> List[DividendRow]:
-        rows: List[DividendRow] = []
+    TICKER_HEADERS = ["Symbol", "Ticker", "symbol"]
+    DATE_HEADERS = ["Transaction Date", "Settlement Date", "Date"]
+    AMOUNT_HEADERS = ["Net Amount", "Amount", "amount"]
+    DESCRIPTION_HEADERS = ["Description"]
+    ACTION_HEADERS = ["Action"]
+    CURRENCY_HEADERS = ["Currency"]
+
+    def iter_rows(self, input_path: str, *, skip_before: Optional[date] = None) -> Iterator[DividendRow]:
+        self.skipped_before_count = 0
 
         with open(input_path, "r", encoding="utf-8-sig", newline="") as file_handle:
-            reader = csv.DictReader(file_handle)
+            reader = csv.reader(file_handle)
+
+            header = next(reader, None)
+            if header is None:
+                return
 
-            for raw_row in reader:
-                dividend_row = self._parse_row(raw_row)
+            plan = self._build_column_plan(header, input_path)
+
+            # Lock the file's date format from its first rows before parsing any of them
+            sample = list(islice(reader, DateParser.SAMPLE_SIZE))
+            date_parser = DateParser()
+            date_parser.detect(
+                value for value in (self._cell(values, plan.trans_date) for values in sample)
+                if value is not None
+            )
+
+            for values in chain(sample, reader):
+                dividend_row = self._parse_row(values, plan, date_parser, skip_before)
                 if dividend_row is None:
                     continue
 
-                rows.append(dividend_row)
-
-        return rows
+                yield dividend_row
+
+    def _build_column_plan(self, header: List[str], input_path: str) -> CsvColumnPlan:
+        positions: Dict[str, int] = {}
+        for index, name in enumerate(header):
+            # Keep the first column when an export repeats a header name
+            positions.setdefault(name, index)
+
+        def resolve(field: str, candidates: List[str]) -> Tuple[int, ...]:
+            present = [candidate for candidate in candidates if candidate in positions]
+            if present:
+                logger.debug("%s: using columns %r for %s", input_path, present, field)
+            else:
+                logger.debug("%s: no column found for %s (tried %s)", input_path, field, candidates)
+
+            return tuple(positions[candidate] for candidate in present)
+
+        return CsvColumnPlan(
+            ticker=resolve("ticker", self.TICKER_HEADERS),
+            trans_date=resolve("date", self.DATE_HEADERS),
+            amount=resolve("amount", self.AMOUNT_HEADERS),
+            description=resolve("description", self.DESCRIPTION_HEADERS),
+            action=resolve("action", self.ACTION_HEADERS),
+            currency=resolve("currency", self.CURRENCY_HEADERS),
+        )
 
-    def _parse_row(self, raw_row: Dict[str, str]) -> Optional[DividendRow]:
-        ticker = self._parse_ticker(raw_row)
+    def _parse_row(
+        self,
+        values: List[str],
+        plan: CsvColumnPlan,
+        date_parser: DateParser,
+        skip_before: Optional[date] = None,
+    ) -> Optional[DividendRow]:
+        ticker = self._parse_ticker(self._cell(values, plan.ticker))
         if ticker is None:
             return None
 
-        trans_date = self._parse_date(raw_row)
+        trans_date = self._parse_date(self._cell(values, plan.trans_date), date_parser)
         if trans_date is None:
             return None
 
-        amount = self._parse_amount(raw_row)
+        if skip_before is not None and trans_date < skip_before:
+            self.skipped_before_count += 1
+            return None
+
+        amount = self._parse_amount(self._cell(values, plan.amount))
         if amount is None:
             return None
 
-        description = raw_row.get("Description") or raw_row.get("Action") or "Dividend"
-        currency = raw_row.get("Currency") or "CAD"
+        description = (
+            self._cell(values, plan.description)
+            or self._cell(values, plan.action)
+            or "Dividend"
+        )
+        currency = self._cell(values, plan.currency) or "CAD"
 
         return DividendRow(
-            ticker=ticker,
+            ticker=sys.intern(ticker),
             trans_date=trans_date,
             amount=amount,
             description=description.strip(),
-            currency=currency.strip().upper(),
+            currency=sys.intern(currency.strip().upper()),
         )
 
-    def _parse_ticker(self, raw_row: Dict[str, str]) -> Optional[str]:
-        ticker = (
-            raw_row.get("Symbol")
-            or raw_row.get("Ticker")
-            or raw_row.get("symbol")
-        )
+    @staticmethod
+    def _cell(values: List[str], indices: Tuple[int, ...]) -> Optional[str]:
+        # Short rows may lack trailing columns; an empty cell falls through to the next candidate
+        for index in indices:
+            if index < len(values) and values[index]:
+                return values[index]
 
+        return None
+
+    def _parse_ticker(self, ticker: Optional[str]) -> Optional[str]:
         if ticker is None:
             return None
 
@@ -76,40 +145,13 @@ class DividendCsvReader(DividendReader):
 
         return ticker
 
-    def _parse_date(self, raw_row: Dict[str, str]) -> Optional[datetime.date]:
-        date_str = (
-            raw_row.get("Transaction Date")
-            or raw_row.get("Settlement Date")
-            or raw_row.get("Date")
-        )
-
+    def _parse_date(self, date_str: Optional[str], date_parser: DateParser) -> Optional[date]:
         if date_str is None:
             return None
 
-        date_str = date_str.strip()
-
-        date_formats = [
-            "%Y-%m-%d",
-            "%d/%m/%Y",
-            "%m/%d/%Y",
-            "%Y-%m-%d %I:%M:%S %p",
-        ]
-
-        for date_format in date_formats:
-            try:
-                return datetime.strptime(date_str, date_format).date()
-            except ValueError:
-                continue
-
-        return None
-
-    def _parse_amount(self, raw_row: Dict[str, str]) -> Optional[Decimal]:
-        amount_str = (
-            raw_row.get("Net Amount")
-            or raw_row.get("Amount")
-            or raw_row.get("amount")
-        )
+        return date_parser.parse(date_str)
 
+    def _parse_amount(self, amount_str: Optional[str]) -> Optional[Decimal]:
         if amount_str is None:
             return None
 
@@ -1,71 +1,454 @@
 from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+import glob
+import logging
 import os
 
 from Importer.AppConfig import AppConfig
 from Importer.DividendReaderFactory import DividendReaderFactory
+from Importer.ImportProfiler import ImportProfiler
+from Importer.ImportStateStore import ImportStateStore
+from Importer.KmymoneyImportJournal import KmymoneyImportJournal
+from Importer.KmymoneyIndexCache import KmymoneyIndexCache
+from Importer.KmymoneyLedgerLock import KmymoneyLedgerLock
 from Importer.KmymoneyXml import KmymoneyXml
+from Importer.Model.DividendInsert import DividendInsert
+from Importer.Model.DividendRow import DividendRow
+from Importer.Model.DuplicateMatch import DuplicateMatch
+from Importer.Model.BatchImportResult import BatchImportResult
+from Importer.Model.ImportOptions import ImportOptions
 from Importer.Model.ImportResult import ImportResult
+from Importer.Model.LedgerIndex import Fingerprint
+from Importer.Model.PortfolioMapping import PortfolioMapping
+from Importer.Model.PortfolioWatermark import PortfolioWatermark
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_input_file(input_path: str, skip_before: Optional[date]) -> Tuple[List[DividendRow], int]:
+    """
+    Process-pool entry point: parses one input file completely and returns its rows
+    with the number dropped by skip_before. Module-level so it can be pickled.
+    """
+    reader = DividendReaderFactory.create_for_path(input_path)
+    rows = list(reader.iter_rows(input_path, skip_before=skip_before))
+    return rows, reader.skipped_before_count
 
 
 class DividendImporter:
     def __init__(self, cfg: AppConfig):
         self._config = cfg
 
-    def import_dividends(self, *, xml_path: str, input_path: str, out_path: str) -> ImportResult:
-        input_filename = os.path.basename(input_path)
+    def import_dividends(
+        self,
+        *,
+        xml_path: str,
+        input_path: str,
+        out_path: str,
+        options: Optional[ImportOptions] = None,
+    ) -> ImportResult:
+        batch_result = self.import_many(
+            xml_path=xml_path,
+            input_paths=[input_path],
+            out_path=out_path,
+            options=options,
+        )
+
+        # Single input: the ledger stages (load, save) belong to this result too
+        result = batch_result.results_by_input[input_path]
+        return replace(result, timings={**batch_result.timings, **result.timings})
+
+    def import_many(
+        self,
+        *,
+        xml_path: str,
+        input_paths: List[str],
+        out_path: str,
+        options: Optional[ImportOptions] = None,
+    ) -> BatchImportResult:
+        """
+        Imports several brokerage files against a single in-memory ledger:
+        - Every input is routed to its PortfolioMapping before the ledger is touched
+        - The KMyMoney file is parsed once and saved once (see ImportOptions for how)
+        - With a state_path, watermarks are only written after the ledger was saved
+        - With journal, out_path is not written: compact_journal writes the entries in
+        """
+        options = options if options is not None else ImportOptions()
+        jobs = self._resolve_portfolios(input_paths)
+        profiler = ImportProfiler()
+        state = ImportStateStore.load(options.state_path) if options.state_path is not None else None
+
+        with profiler.measure("ledger_load"):
+            kmymoney = self.open_ledger(xml_path, options)
+
+        import_journal = KmymoneyImportJournal(xml_path) if options.journal else None
+        if import_journal is not None:
+            with profiler.measure("journal_load"):
+                kmymoney.index_dividends(import_journal.read())
+
+        results_by_input: Dict[str, ImportResult] = {}
+        new_watermarks: Dict[str, PortfolioWatermark] = {}
+        previous_watermarks = [
+            state.watermark_for(portfolio.name) if state is not None else None
+            for _, portfolio in jobs
+        ]
+
+        for input_path, portfolio, result in self._run_jobs(
+            kmymoney,
+            jobs,
+            previous_watermarks,
+            options,
+            import_journal,
+        ):
+            results_by_input[input_path] = result
+
+            if result.watermark is not None:
+                merged = new_watermarks.get(portfolio.name)
+                new_watermarks[portfolio.name] = (
+                    result.watermark if merged is None
+                    else ImportStateStore.merge_conservative(merged, result.watermark)
+                )
+
+        if import_journal is None:
+            # Same lock as watcher checkpoints, so a resident watcher's save is never overwritten
+            with KmymoneyLedgerLock(out_path), profiler.measure("save"):
+                kmymoney.save(out_path, splice=options.splice or options.scan_only)
+
+        if state is not None:
+            for portfolio_name, watermark in new_watermarks.items():
+                state.update(portfolio_name, watermark)
+            state.save()
+
+        return BatchImportResult(results_by_input=results_by_input, timings=profiler.timings())
+
+    def compact_journal(
+        self,
+        *,
+        xml_path: str,
+        out_path: str,
+        options: Optional[ImportOptions] = None,
+    ) -> ImportResult:
+        """
+        Writes the transactions waiting in xml_path's journal into the ledger in a
+        single splice pass, allocating their ids against the ledger as it is now.
+        Entries the ledger already has (e.g. entered in KMyMoney meanwhile) are
+        skipped. The journal is removed once it has been written over xml_path.
+        """
+        options = options if options is not None else ImportOptions()
+        import_journal = KmymoneyImportJournal(xml_path)
+        in_place = os.path.abspath(out_path) == os.path.abspath(xml_path)
+        kmymoney = self.open_ledger(xml_path, options)
+
+        # Journaled imports append under this lock: nothing can land between read() and clear()
+        with KmymoneyLedgerLock(xml_path):
+            inserts = import_journal.read()
+
+            new_inserts = [
+                insert for insert in inserts
+                if not kmymoney.has_duplicate_dividend(
+                    postdate=insert.row.trans_date.isoformat(),
+                    security_account_id=insert.security_account_id,
+                    amount=insert.row.amount,
+                    cash_account_id=insert.cash_account_id,
+                    commodity_id=insert.row.currency,
+                )
+            ]
+            transaction_ids = kmymoney.add_dividend_transactions(new_inserts)
+
+            if in_place:
+                kmymoney.save(out_path, splice=True)
+                import_journal.clear()
+            else:
+                with KmymoneyLedgerLock(out_path):
+                    kmymoney.save(out_path, splice=True)
+                logger.info("Journal %s kept: it was compacted into %s, not %s", import_journal.path, out_path, xml_path)
+
+        return ImportResult(
+            imported_count=len(transaction_ids),
+            skipped_count=0,
+            duplicate_count=len(inserts) - len(new_inserts),
+            transaction_ids=transaction_ids,
+        )
+
+    def import_into(
+        self,
+        kmymoney: KmymoneyXml,
+        input_path: str,
+        options: Optional[ImportOptions] = None,
+    ) -> ImportResult:
+        """
+        Applies one input to an already loaded ledger without saving it.
+        Used by the watch mode, which keeps the ledger resident between files.
+        """
+        [(input_path, portfolio)] = self._resolve_portfolios([input_path])
+
+        return self._import_file(
+            kmymoney,
+            input_path,
+            portfolio,
+            options if options is not None else ImportOptions(),
+        )
+
+    @staticmethod
+    def open_ledger(xml_path: str, options: ImportOptions) -> KmymoneyXml:
+        return KmymoneyXml(
+            xml_path,
+            compression_level=options.compression_level,
+            index_cache=KmymoneyIndexCache() if options.use_index_cache else None,
+            backend=options.xml_backend,
+            scan_only=options.scan_only,
+        )
 
-        portfolio = self._config.portfolio_for_input_filename(input_filename)
-        if portfolio is None:
-            raise ValueError(
-                f"No portfolio mapping matches input filename: {input_filename}. "
-                "Update config.json (filename_contains)."
-            )
+    @staticmethod
+    def expand_input_paths(patterns: List[str]) -> List[str]:
+        """
+        Expands command-line inputs into a de-duplicated list of files:
+        - A directory contributes every supported file directly inside it (sorted)
+        - A glob pattern contributes its matches (sorted)
+        - Anything else is taken as a file path
+        """
+        input_paths: List[str] = []
 
-        reader = DividendReaderFactory.create_for_path(input_path)
-        rows = reader.read(input_path)
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                candidates = sorted(
+                    os.path.join(pattern, filename)
+                    for filename in os.listdir(pattern)
+                )
+                matches = [
+                    path for path in candidates
+                    if os.path.isfile(path) and DividendReaderFactory.is_supported_path(path)
+                ]
+            elif glob.has_magic(pattern):
+                matches = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+            else:
+                matches = [pattern]
 
-        kmymoney = KmymoneyXml(xml_path)
+            for path in matches:
+                if path not in input_paths:
+                    input_paths.append(path)
+
+        return input_paths
+
+    def _resolve_portfolios(self, input_paths: List[str]) -> List[Tuple[str, PortfolioMapping]]:
+        jobs: List[Tuple[str, PortfolioMapping]] = []
+
+        for input_path in input_paths:
+            input_filename = os.path.basename(input_path)
+
+            portfolio = self._config.portfolio_for_input_filename(input_filename)
+            if portfolio is None:
+                raise ValueError(
+                    f"No portfolio mapping matches input filename: {input_filename}. "
+                    "Update config.json (filename_contains)."
+                )
+
+            jobs.append((input_path, portfolio))
+
+        return jobs
+
+    def _run_jobs(
+        self,
+        kmymoney: KmymoneyXml,
+        jobs: List[Tuple[str, PortfolioMapping]],
+        previous_watermarks: List[Optional[PortfolioWatermark]],
+        options: ImportOptions,
+        journal: Optional[KmymoneyImportJournal] = None,
+    ) -> Iterable[Tuple[str, PortfolioMapping, ImportResult]]:
+        if options.workers <= 1 or len(jobs) <= 1:
+            for (input_path, portfolio), previous in zip(jobs, previous_watermarks):
+                yield input_path, portfolio, self._import_file(
+                    kmymoney,
+                    input_path,
+                    portfolio,
+                    options,
+                    previous,
+                    journal=journal,
+                )
+            return
+
+        with ProcessPoolExecutor(max_workers=min(options.workers, len(jobs))) as pool:
+            futures: List[Future] = [
+                pool.submit(_parse_input_file, input_path, self._skip_before(previous))
+                for (input_path, _), previous in zip(jobs, previous_watermarks)
+            ]
+
+            # Apply in submission order while later files are still being parsed
+            for (input_path, portfolio), previous, future in zip(jobs, previous_watermarks, futures):
+                profiler = ImportProfiler()
+                with profiler.measure("read_wait"):
+                    rows, skipped_before_count = future.result()
+
+                result = self._import_file(
+                    kmymoney,
+                    input_path,
+                    portfolio,
+                    options,
+                    previous,
+                    rows=rows,
+                    skipped_before_count=skipped_before_count,
+                    profiler=profiler,
+                    journal=journal,
+                )
+                yield input_path, portfolio, result
+
+    @staticmethod
+    def _skip_before(previous_watermark: Optional[PortfolioWatermark]) -> Optional[date]:
+        return previous_watermark.last_date if previous_watermark is not None else None
+
+    def _import_file(
+        self,
+        kmymoney: KmymoneyXml,
+        input_path: str,
+        portfolio: PortfolioMapping,
+        options: ImportOptions,
+        previous_watermark: Optional[PortfolioWatermark] = None,
+        *,
+        rows: Optional[Iterable[DividendRow]] = None,
+        skipped_before_count: int = 0,
+        profiler: Optional[ImportProfiler] = None,
+        journal: Optional[KmymoneyImportJournal] = None,
+    ) -> ImportResult:
+        """
+        Applies one input to the ledger, or appends its new transactions to journal
+        when one is given. rows are parsed here unless the caller already did it
+        (process-pool mode, which also passes the reader's skipped_before_count).
+        """
+        profiler = profiler if profiler is not None else ImportProfiler()
+        skip_before = self._skip_before(previous_watermark)
+        if skip_before is not None:
+            logger.info("%s: skipping rows before %s (already processed)", input_path, skip_before)
+
+        reader = None
+        if rows is None:
+            reader = DividendReaderFactory.create_for_path(input_path)
+            # Stream rows straight into the ledger; the input is never held in memory as a whole
+            rows = reader.iter_rows(input_path, skip_before=skip_before)
+            if options.profile_rows:
+                rows = profiler.measure_iter("read", rows)
+
+        find_duplicate = kmymoney.find_duplicate_dividend
+        if options.profile_rows:
+            find_duplicate = profiler.wrap("lookup", find_duplicate)
 
-        imported_count = 0
         skipped_count = 0
-        duplicate_count = 0
+        already_processed_count = 0
+        duplicate_matches: List[DuplicateMatch] = []
+
+        # New transactions are inserted as one batch at the end; pending_keys catches
+        # rows repeated within this input, which the ledger index cannot see yet
+        pending: List[DividendInsert] = []
+        pending_keys: Set[Fingerprint] = set()
+
+        # Watermark candidate: the latest processed day and the rows seen on it
+        last_date = None
+        fingerprints_at_last_date: Set[Tuple[str, str, str]] = set()
+        earliest_unmapped: Optional[date] = None
+
+        # One timer around the loop; per-row stages are only recorded with profile_rows
+        with profiler.measure("rows"):
+            for row in rows:
+                fingerprint = ImportStateStore.fingerprint(row)
+
+                if last_date is None or row.trans_date > last_date:
+                    last_date = row.trans_date
+                    fingerprints_at_last_date = set()
+                if row.trans_date == last_date:
+                    fingerprints_at_last_date.add(fingerprint)
+
+                if (
+                    previous_watermark is not None
+                    and row.trans_date == previous_watermark.last_date
+                    and fingerprint in previous_watermark.fingerprints_at_last_date
+                ):
+                    already_processed_count += 1
+                    continue
+
+                security_account_id = portfolio.security_account_for_ticker(row.ticker)
+                if security_account_id is None:
+                    logger.debug("Skipping row (no security mapping): %s", row)
+                    skipped_count += 1
+                    if earliest_unmapped is None or row.trans_date < earliest_unmapped:
+                        earliest_unmapped = row.trans_date
+                    continue
+
+                postdate = row.trans_date.isoformat()
 
-        for row in rows:
-            security_account_id = portfolio.security_account_for_ticker(row.ticker)
-            if security_account_id is None:
-                print(f"Skipping row: {row}")
-                skipped_count += 1
-                continue
+                match = find_duplicate(
+                    postdate=postdate,
+                    security_account_id=security_account_id,
+                    amount=row.amount,
+                    cash_account_id=portfolio.brokerage_cash_account_id,
+                    commodity_id=row.currency,
+                    window_days=options.duplicate_window_days,
+                )
 
-            postdate = row.trans_date.isoformat()
+                if match is None:
+                    pending_key = kmymoney.dividend_fingerprint(
+                        postdate=postdate,
+                        security_account_id=security_account_id,
+                        cash_account_id=portfolio.brokerage_cash_account_id,
+                        amount=row.amount,
+                        commodity_id=row.currency,
+                    )
+                    if pending_key is not None and pending_key in pending_keys:
+                        match = (KmymoneyXml.UNSAVED_TRANSACTION_ID, 0)
 
-            if kmymoney.has_duplicate_dividend(
-                postdate=postdate,
-                security_account_id=security_account_id,
-                amount=row.amount,
-                cash_account_id=portfolio.brokerage_cash_account_id,
-            ):
-                print(f"Skipping row: {row}")
-                duplicate_count += 1
-                continue
+                if match is not None:
+                    logger.debug("Skipping row (already exists as %s, %+d day(s)): %s", match[0], match[1], row)
+                    duplicate_matches.append(DuplicateMatch(row=row, transaction_id=match[0], days_apart=match[1]))
+                    continue
 
-            transaction_id = kmymoney.next_transaction_id()
+                if pending_key is not None:
+                    pending_keys.add(pending_key)
+                pending.append(
+                    DividendInsert(
+                        row=row,
+                        cash_account_id=portfolio.brokerage_cash_account_id,
+                        security_account_id=security_account_id,
+                        income_account_id=portfolio.income_gain_account_id,
+                    )
+                )
 
-            kmymoney.add_dividend_transaction(
-                row=row,
-                transaction_id=transaction_id,
-                cash_account_id=portfolio.brokerage_cash_account_id,
-                security_account_id=security_account_id,
-                income_account_id=portfolio.income_gain_account_id,
-            )
+        # Unmapped rows must be read again once their ticker is mapped: stop the
+        # watermark the day before the first of them (later days are re-checked
+        # against the ledger, so nothing is imported twice)
+        if earliest_unmapped is not None:
+            last_date = earliest_unmapped - timedelta(days=1)
+            fingerprints_at_last_date = set()
 
-            imported_count += 1
+        # Rows before the watermark day never reach the loop; the reader counted them
+        if reader is not None:
+            skipped_before_count = reader.skipped_before_count
+        already_processed_count += skipped_before_count
 
-        kmymoney.save(out_path)
+        with profiler.measure("insert"):
+            if journal is not None:
+                # Ids are only allocated at compaction; the lock keeps this append out of a running one
+                with KmymoneyLedgerLock(kmymoney.xml_path):
+                    journal.append(pending)
+                kmymoney.index_dividends(pending)
+                transaction_ids = []
+            else:
+                transaction_ids = kmymoney.add_dividend_transactions(pending)
 
         return ImportResult(
-            imported_count=imported_count,
+            imported_count=len(pending),
             skipped_count=skipped_count,
-            duplicate_count=duplicate_count,
-        )
\ No newline at end of file
+            duplicate_count=len(duplicate_matches),
+            timings=profiler.timings(),
+            already_processed_count=already_processed_count,
+            watermark=(
+                PortfolioWatermark(
+                    last_date=last_date,
+                    fingerprints_at_last_date=frozenset(fingerprints_at_last_date),
+                )
+                if last_date is not None else None
+            ),
+            transaction_ids=transaction_ids,
+            duplicate_matches=duplicate_matches,
+        )
@@ -1,18 +1,35 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import date
+from typing import Iterator, List, Optional
 
 from Importer.Model.DividendRow import DividendRow
 
 
 class DividendReader(ABC):
+    # Rows the last iter_rows call dropped for being dated before skip_before;
+    # final once its iterator is exhausted
+    skipped_before_count = 0
+
     @abstractmethod
-    def read(self, input_path: str) -> List[DividendRow]:
+    def iter_rows(self, input_path: str, *, skip_before: Optional[date] = None) -> Iterator[DividendRow]:
         """
-        Reads a dividend input file and returns a list of parsed DividendRow objects.
+        Lazily parses a dividend input file, yielding DividendRow objects one at a time
+        so callers can process rows while the file is still being read.
+
+        Rows dated before skip_before are dropped as soon as their date is parsed,
+        without building a DividendRow (used for incremental imports), and counted
+        in skipped_before_count.
 
         Implementations:
         - DividendCsvReader
         - DividendXlsxReader
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def read(self, input_path: str) -> List[DividendRow]:
+        """
+        Reads a dividend input file and returns a list of parsed DividendRow objects.
+        Kept for callers that need the whole file at once; prefer iter_rows.
+        """
+        return list(self.iter_rows(input_path))
\ No newline at end of file
@@ -5,24 +5,39 @@ import os
 from Importer.DividendCsvReader import DividendCsvReader
 from Importer.DividendReader import DividendReader
 from Importer.DividendXlsxReader import DividendXlsxReader
+from Importer.PriceCsvReader import PriceCsvReader
+from Importer.PriceXlsxReader import PriceXlsxReader
 
 
 class DividendReaderFactory:
+    CSV_EXTENSIONS = [".csv", ".txt"]
+    XLSX_EXTENSIONS = [".xlsx"]
+
     @staticmethod
-    def create_for_path(input_path: str) -> DividendReader:
+    def create_for_path(input_path: str, *, prices: bool = False) -> DividendReader:
+        """
+        prices=True returns the price history readers (PriceCsvReader, PriceXlsxReader),
+        which share the dividend readers' parsing and yield the price as the row amount.
+        """
         extension = DividendReaderFactory._get_extension(input_path)
 
-        if extension in [".csv", ".txt"]:
-            return DividendCsvReader()
+        if extension in DividendReaderFactory.CSV_EXTENSIONS:
+            return PriceCsvReader() if prices else DividendCsvReader()
 
-        if extension == ".xlsx":
-            return DividendXlsxReader()
+        if extension in DividendReaderFactory.XLSX_EXTENSIONS:
+            return PriceXlsxReader() if prices else DividendXlsxReader()
 
         raise ValueError(
-            f"Unsupported dividend input file extension: {extension}. "
+            f"Unsupported input file extension: {extension}. "
             "Supported extensions: .csv, .csv.txt, .xlsx"
         )
 
+    @staticmethod
+    def is_supported_path(input_path: str) -> bool:
+        extension = DividendReaderFactory._get_extension(input_path)
+
+        return extension in DividendReaderFactory.CSV_EXTENSIONS + DividendReaderFactory.XLSX_EXTENSIONS
+
     @staticmethod
     def _get_extension(input_path: str) -> str:
         """
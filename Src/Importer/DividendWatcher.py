@@ -0,0 +1,162 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+import logging
+import os
+import time
+
+from Importer.DividendImporter import DividendImporter
+from Importer.KmymoneyLedgerLock import KmymoneyLedgerLock
+from Importer.KmymoneyXml import KmymoneyXml
+from Importer.Model.ImportOptions import ImportOptions
+from Importer.Model.ImportResult import ImportResult
+
+logger = logging.getLogger(__name__)
+
+
+class DividendWatcher:
+    """
+    Long-running import loop over a drop directory, with the ledger kept in memory.
+
+    - The directory is polled every poll_interval seconds; a file is imported once
+      its size and mtime have stayed the same across two polls (so half-copied
+      downloads are left alone), and again whenever it changes later
+    - Each file is routed through the config like a regular run and applied to the
+      resident ledger, so only the new file is parsed
+    - Writes are debounced: the ledger is checkpointed (splice save under a
+      KmymoneyLedgerLock) once no file has been imported for debounce seconds
+    - If the ledger changes on disk (KMyMoney saved it), it is reloaded and the
+      files not yet written back are re-applied; duplicate detection skips
+      anything the other writer already has
+    """
+
+    def __init__(
+        self,
+        importer: DividendImporter,
+        *,
+        watch_dir: str,
+        xml_path: str,
+        out_path: str,
+        options: ImportOptions,
+        poll_interval: float = 2.0,
+        debounce: float = 5.0,
+    ) -> None:
+        self._importer = importer
+        self._watch_dir = watch_dir
+        self._xml_path = xml_path
+        self._out_path = out_path
+        self._options = options
+        self._poll_interval = poll_interval
+        self._debounce = debounce
+        self._ledger: Optional[KmymoneyXml] = None
+        self._imported: Dict[str, Tuple[int, int]] = {}
+        self._settling: Dict[str, Tuple[int, int]] = {}
+        # Inputs whose transactions are not in the ledger file yet, for replay after a reload
+        self._unsaved_inputs: List[str] = []
+        self._dirty = False
+        self._last_import_at = 0.0
+
+    def run(self) -> None:
+        """
+        Polls until interrupted (Ctrl+C), then writes any pending imports.
+        """
+        logger.info(
+            "Watching %s (every %.1fs, checkpoint after %.1fs idle)",
+            self._watch_dir,
+            self._poll_interval,
+            self._debounce,
+        )
+        self._load_ledger()
+
+        try:
+            while True:
+                self.poll_once()
+                time.sleep(self._poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch")
+        finally:
+            if self._dirty:
+                self.checkpoint()
+
+    def poll_once(self) -> None:
+        if self._ledger is None:
+            self._load_ledger()
+        elif self._ledger.changed_on_disk():
+            logger.info("%s changed on disk; reloading", self._ledger.xml_path)
+            self._load_ledger()
+
+        for input_path in self._settled_inputs():
+            self._import(input_path)
+
+        if self._dirty and time.monotonic() - self._last_import_at >= self._debounce:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        with KmymoneyLedgerLock(self._out_path):
+            # Re-checked under the lock: never splice over a ledger someone else just saved
+            if self._ledger.changed_on_disk():
+                logger.info("%s changed on disk before checkpoint; reloading", self._ledger.xml_path)
+                self._load_ledger()
+
+            self._ledger.save(self._out_path, splice=True)
+
+        logger.info("Checkpoint written to %s", self._out_path)
+        self._dirty = False
+
+        if os.path.abspath(self._out_path) == os.path.abspath(self._ledger.xml_path):
+            self._unsaved_inputs = []
+
+    def _load_ledger(self) -> None:
+        self._ledger = DividendImporter.open_ledger(self._xml_path, self._options)
+
+        for input_path in self._unsaved_inputs:
+            self._apply(input_path)
+
+    def _settled_inputs(self) -> List[str]:
+        settled: List[str] = []
+
+        for input_path in DividendImporter.expand_input_paths([self._watch_dir]):
+            try:
+                stat = os.stat(input_path)
+            except FileNotFoundError:
+                continue
+
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._imported.get(input_path) == signature:
+                continue
+
+            if self._settling.get(input_path) == signature:
+                del self._settling[input_path]
+                self._imported[input_path] = signature
+                settled.append(input_path)
+            else:
+                self._settling[input_path] = signature
+
+        return settled
+
+    def _import(self, input_path: str) -> None:
+        result = self._apply(input_path)
+        if result is None:
+            return
+
+        logger.info(
+            "%s: imported %d, skipped %d, already present %d",
+            input_path,
+            result.imported_count,
+            result.skipped_count,
+            result.duplicate_count,
+        )
+
+        if result.imported_count:
+            if input_path not in self._unsaved_inputs:
+                self._unsaved_inputs.append(input_path)
+            self._dirty = True
+            self._last_import_at = time.monotonic()
+
+    def _apply(self, input_path: str) -> Optional[ImportResult]:
+        try:
+            return self._importer.import_into(self._ledger, input_path, self._options)
+        except Exception:
+            # One bad export must not stop the watch; it is retried once the file changes
+            logger.exception("Could not import %s", input_path)
+            return None
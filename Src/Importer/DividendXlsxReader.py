@@ -1,45 +1,71 @@
 from __future__ import annotations
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from openpyxl import load_workbook
 
+import sys
+
+from Importer.DateParser import DateParser
 from Importer.DividendReader import DividendReader
 from Importer.Model.DividendRow import DividendRow
 
 
 class DividendXlsxReader(DividendReader):
-    def read(self, input_path: str) -> List[DividendRow]:
-        workbook = load_workbook(filename=input_path, data_only=True)
-        worksheet = workbook.active
-
-        header_map = self._read_header_map(worksheet)
-        if header_map is None:
-            return []
-
-        rows: List[DividendRow] = []
-
-        for row_index in range(2, worksheet.max_row + 1):
-            raw_row = self._read_row_as_dict(worksheet, row_index, header_map)
-            if raw_row is None:
-                continue
-
-            dividend_row = self._parse_row(raw_row)
-            if dividend_row is None:
-                continue
-
-            rows.append(dividend_row)
+    DATE_HEADERS = ["Transaction Date", "Settlement Date", "Date"]
+    AMOUNT_HEADERS = ["Net Amount", "Amount", "amount"]
 
-        return rows
+    def iter_rows(self, input_path: str, *, skip_before: Optional[date] = None) -> Iterator[DividendRow]:
+        """
+        Opens the workbook in read-only mode and walks rows as value tuples,
+        so openpyxl never builds the full cell graph in memory.
+        """
+        self.skipped_before_count = 0
+        workbook = load_workbook(filename=input_path, read_only=True, data_only=True)
 
-    def _read_header_map(self, worksheet: Any) -> Optional[Dict[str, int]]:
+        try:
+            worksheet = workbook.active
+            values = worksheet.iter_rows(values_only=True)
+
+            header_map = self._read_header_map(next(values, None))
+            if header_map is None:
+                return
+
+            raw_rows = (
+                raw_row
+                for raw_row in (self._read_row_as_dict(row_values, header_map) for row_values in values)
+                if raw_row is not None
+            )
+
+            # Lock the file's date format from its first rows before parsing any of them.
+            # Cells Excel already typed as dates skip string parsing entirely.
+            sample = [raw_row for _, raw_row in zip(range(DateParser.SAMPLE_SIZE), raw_rows)]
+            date_parser = DateParser()
+            date_parser.detect(
+                str(value) for value in (self._get_value(raw_row, self.DATE_HEADERS) for raw_row in sample)
+                if value is not None and not isinstance(value, date)
+            )
+
+            for raw_row in chain(sample, raw_rows):
+                dividend_row = self._parse_row(raw_row, date_parser, skip_before)
+                if dividend_row is None:
+                    continue
+
+                yield dividend_row
+        finally:
+            workbook.close()
+
+    def _read_header_map(self, header_values: Optional[Tuple[Any, ...]]) -> Optional[Dict[str, int]]:
         """
-        Returns a mapping of header name -> column index (1-based).
+        Returns a mapping of header name -> column index (0-based, into the row tuple).
         """
+        if header_values is None:
+            return None
+
         header_map: Dict[str, int] = {}
 
-        for col_index in range(1, worksheet.max_column + 1):
-            cell_value = worksheet.cell(row=1, column=col_index).value
+        for col_index, cell_value in enumerate(header_values):
             if cell_value is None:
                 continue
 
@@ -56,19 +82,20 @@ class DividendXlsxReader(DividendReader):
 
     def _read_row_as_dict(
         self,
-        worksheet: Any,
-        row_index: int,
+        row_values: Tuple[Any, ...],
         header_map: Dict[str, int]
     ) -> Optional[Dict[str, Any]]:
         """
-        Reads a worksheet row into a dict using the header row names.
+        Maps a row tuple into a dict using the header row names.
         If the row is completely empty, returns None.
         """
         raw_row: Dict[str, Any] = {}
         any_value = False
+        row_length = len(row_values)
 
         for header, col_index in header_map.items():
-            value = worksheet.cell(row=row_index, column=col_index).value
+            # Read-only sheets may return short tuples for rows with trailing empty cells
+            value = row_values[col_index] if col_index < row_length else None
             raw_row[header] = value
 
             if value is not None and str(value).strip() != "":
@@ -79,15 +106,24 @@ class DividendXlsxReader(DividendReader):
 
         return raw_row
 
-    def _parse_row(self, raw_row: Dict[str, Any]) -> Optional[DividendRow]:
+    def _parse_row(
+        self,
+        raw_row: Dict[str, Any],
+        date_parser: DateParser,
+        skip_before: Optional[date] = None,
+    ) -> Optional[DividendRow]:
         ticker = self._parse_ticker(raw_row)
         if ticker is None:
             return None
 
-        trans_date = self._parse_date(raw_row)
+        trans_date = self._parse_date(raw_row, date_parser)
         if trans_date is None:
             return None
 
+        if skip_before is not None and trans_date < skip_before:
+            self.skipped_before_count += 1
+            return None
+
         amount = self._parse_amount(raw_row)
         if amount is None:
             return None
@@ -96,11 +132,11 @@ class DividendXlsxReader(DividendReader):
         currency = self._get_string(raw_row, ["Currency"]) or "CAD"
 
         return DividendRow(
-            ticker=ticker,
+            ticker=sys.intern(ticker),
             trans_date=trans_date,
             amount=amount,
             description=description.strip(),
-            currency=currency.strip().upper(),
+            currency=sys.intern(currency.strip().upper()),
         )
 
     def _parse_ticker(self, raw_row: Dict[str, Any]) -> Optional[str]:
@@ -114,8 +150,8 @@ class DividendXlsxReader(DividendReader):
 
         return ticker
 
-    def _parse_date(self, raw_row: Dict[str, Any]) -> Optional[date]:
-        value = self._get_value(raw_row, ["Transaction Date", "Settlement Date", "Date"])
+    def _parse_date(self, raw_row: Dict[str, Any], date_parser: DateParser) -> Optional[date]:
+        value = self._get_value(raw_row, self.DATE_HEADERS)
         if value is None:
             return None
 
@@ -125,27 +161,10 @@ class DividendXlsxReader(DividendReader):
         if isinstance(value, date):
             return value
 
-        date_str = str(value).strip()
-        if not date_str:
-            return None
-
-        date_formats = [
-            "%Y-%m-%d",
-            "%d/%m/%Y",
-            "%m/%d/%Y",
-            "%Y-%m-%d %I:%M:%S %p",
-        ]
-
-        for date_format in date_formats:
-            try:
-                return datetime.strptime(date_str, date_format).date()
-            except ValueError:
-                continue
-
-        return None
+        return date_parser.parse(str(value))
 
     def _parse_amount(self, raw_row: Dict[str, Any]) -> Optional[Decimal]:
-        value = self._get_value(raw_row, ["Net Amount", "Amount", "amount"])
+        value = self._get_value(raw_row, self.AMOUNT_HEADERS)
         if value is None:
             return None
 
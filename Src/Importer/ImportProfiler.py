@@ -0,0 +1,70 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, TypeVar
+
+import time
+
+from Importer.Model.StageTiming import StageTiming
+
+T = TypeVar("T")
+
+
+class ImportProfiler:
+    """
+    Accumulates wall time and call counts per named stage of an import
+    (reading, ledger parsing, lookups, inserts, saving).
+    """
+
+    def __init__(self) -> None:
+        self._seconds: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(stage, time.perf_counter() - started)
+
+    def measure_iter(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Wraps a lazy iterable so only the time spent producing each item is
+        charged to the stage (not the caller's work between items).
+        """
+        iterator = iter(iterable)
+
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._add(stage, time.perf_counter() - started)
+                return
+
+            self._add(stage, time.perf_counter() - started)
+            yield item
+
+    def wrap(self, stage: str, func: Callable[..., T]) -> Callable[..., T]:
+        """
+        Returns func with every call charged to the stage. Callers swap it in only
+        when per-call timing was asked for, so unprofiled hot loops pay nothing.
+        """
+        def timed(*args, **kwargs) -> T:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add(stage, time.perf_counter() - started)
+
+        return timed
+
+    def timings(self) -> Dict[str, StageTiming]:
+        return {
+            stage: StageTiming(seconds=self._seconds[stage], calls=self._calls[stage])
+            for stage in self._seconds
+        }
+
+    def _add(self, stage: str, seconds: float) -> None:
+        self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+        self._calls[stage] = self._calls.get(stage, 0) + 1
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+import json
+import os
+
+from Importer.KmymoneyFileIO import KmymoneyFileIO
+from Importer.Model.DividendRow import DividendRow
+from Importer.Model.PortfolioWatermark import PortfolioWatermark
+
+
+class ImportStateStore:
+    """
+    Per-portfolio watermarks for incremental imports, stored as JSON and keyed by
+    PortfolioMapping.name.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str, watermarks: Dict[str, PortfolioWatermark]) -> None:
+        # Rule 4: constructor only assigns fields
+        self._path = path
+        self._watermarks = watermarks
+
+    @staticmethod
+    def load(path: str) -> "ImportStateStore":
+        """
+        Reads the state file; a missing file means nothing has been processed yet.
+        """
+        if not os.path.exists(path):
+            return ImportStateStore(path, {})
+
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        if raw.get("version") != ImportStateStore.FORMAT_VERSION:
+            raise ValueError(f"Unsupported import state version in {path}: {raw.get('version')}")
+
+        watermarks: Dict[str, PortfolioWatermark] = {}
+
+        for name, entry in raw.get("portfolios", {}).items():
+            watermarks[name] = PortfolioWatermark(
+                last_date=date.fromisoformat(entry["last_date"]),
+                fingerprints_at_last_date=frozenset(
+                    tuple(fingerprint) for fingerprint in entry["fingerprints_at_last_date"]
+                ),
+            )
+
+        return ImportStateStore(path, watermarks)
+
+    @staticmethod
+    def fingerprint(row: DividendRow) -> Tuple[str, str, str]:
+        # normalize() so 0.10 from a CSV and 0.1 from an XLSX float fingerprint the same
+        amount = row.amount.normalize() if row.amount != 0 else Decimal(0)
+        return row.ticker, row.trans_date.isoformat(), str(amount)
+
+    def watermark_for(self, portfolio_name: str) -> Optional[PortfolioWatermark]:
+        return self._watermarks.get(portfolio_name)
+
+    def update(self, portfolio_name: str, watermark: PortfolioWatermark) -> None:
+        self._watermarks[portfolio_name] = watermark
+
+    @staticmethod
+    def merge_conservative(first: PortfolioWatermark, second: PortfolioWatermark) -> PortfolioWatermark:
+        """
+        Combines the watermarks of two inputs of one batch that map to the same
+        portfolio: the earlier one wins, and on the same day only rows both inputs
+        processed stay skippable.
+        """
+        if first.last_date != second.last_date:
+            return first if first.last_date < second.last_date else second
+
+        return PortfolioWatermark(
+            last_date=first.last_date,
+            fingerprints_at_last_date=first.fingerprints_at_last_date & second.fingerprints_at_last_date,
+        )
+
+    def save(self) -> None:
+        raw: Dict[str, Any] = {
+            "version": self.FORMAT_VERSION,
+            "portfolios": {
+                name: {
+                    "last_date": watermark.last_date.isoformat(),
+                    "fingerprints_at_last_date": sorted(watermark.fingerprints_at_last_date),
+                }
+                for name, watermark in sorted(self._watermarks.items())
+            },
+        }
+
+        with KmymoneyFileIO.replace_atomically(self._path, prefix=".import-state-") as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(raw, f, indent=2)
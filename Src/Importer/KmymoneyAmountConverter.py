@@ -0,0 +1,87 @@
+from __future__ import annotations
+from decimal import Decimal
+from math import gcd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class KmymoneyAmountConverter:
+    """
+    Converts Decimal amounts to KMyMoney rationals using each commodity's smallest
+    account fraction ('saf' on <CURRENCY>/<SECURITY>): 100 for CAD/USD, 1 for JPY,
+    1000 for 3-decimal currencies, and so on.
+
+    Results are memoized per (commodity, amount): dividend exports repeat the same
+    amounts a lot, and each conversion is otherwise a Decimal multiply plus rounding.
+    """
+
+    DEFAULT_FRACTION = 100
+
+    def __init__(self, fractions: Optional[Dict[str, int]] = None) -> None:
+        self._fractions: Dict[str, int] = dict(fractions or {})
+        self._units_cache: Dict[Tuple[Optional[str], Decimal], int] = {}
+
+    @property
+    def fractions(self) -> Dict[str, int]:
+        return dict(self._fractions)
+
+    def register(self, commodity_id: str, fraction: Optional[str]) -> None:
+        """
+        Records a commodity's fraction from its raw 'saf' attribute; invalid values are ignored.
+        """
+        try:
+            value = int(fraction) if fraction is not None else 0
+        except ValueError:
+            return
+
+        if value > 0:
+            self._fractions[commodity_id] = value
+            self._units_cache.clear()
+
+    def fraction_for(self, commodity_id: Optional[str]) -> int:
+        if commodity_id is None:
+            return self.DEFAULT_FRACTION
+
+        return self._fractions.get(commodity_id, self.DEFAULT_FRACTION)
+
+    def to_units(self, amount: Decimal, commodity_id: Optional[str] = None) -> int:
+        """
+        Amount in the commodity's smallest units (cents for CAD), rounded like KMyMoney values.
+        """
+        key = (commodity_id, amount)
+        units = self._units_cache.get(key)
+
+        if units is None:
+            units = int((amount * self.fraction_for(commodity_id)).to_integral_value())
+            self._units_cache[key] = units
+
+        return units
+
+    def to_rational(self, amount: Decimal, commodity_id: Optional[str] = None) -> str:
+        return f"{self.to_units(amount, commodity_id)}/{self.fraction_for(commodity_id)}"
+
+    def to_reduced(self, amount: Decimal, commodity_id: Optional[str] = None) -> Tuple[int, int]:
+        units = self.to_units(amount, commodity_id)
+        fraction = self.fraction_for(commodity_id)
+        divisor = gcd(units, fraction)
+
+        return units // divisor, fraction // divisor
+
+    def to_rationals(self, amounts: Iterable[Decimal], commodity_id: Optional[str] = None) -> List[str]:
+        """
+        Batch form of to_rational for a whole column of one commodity.
+        """
+        fraction = self.fraction_for(commodity_id)
+        suffix = f"/{fraction}"
+        units_cache = self._units_cache
+        rationals: List[str] = []
+
+        for amount in amounts:
+            key = (commodity_id, amount)
+            units = units_cache.get(key)
+            if units is None:
+                units = int((amount * fraction).to_integral_value())
+                units_cache[key] = units
+
+            rationals.append(f"{units}{suffix}")
+
+        return rationals
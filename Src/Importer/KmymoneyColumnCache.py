@@ -0,0 +1,79 @@
+from __future__ import annotations
+from array import array
+from typing import Optional, Tuple
+
+import json
+import logging
+import os
+
+from Importer.Model.DividendColumns import DividendColumns
+from Importer.SidecarFile import SidecarFile
+
+logger = logging.getLogger(__name__)
+
+
+class KmymoneyColumnCache:
+    """
+    Persists a ledger's DividendColumns next to it (<ledger>.importer-columns.bin):
+    one JSON header line, then the raw bytes of each column in order.
+
+    Loading is a straight read into array('q') buffers, with no XML involved.
+    NumPy is not needed to read or write the file. Entries are trusted under the
+    same rule as KmymoneyIndexCache (SidecarFile.is_current).
+    """
+
+    SUFFIX = ".importer-columns.bin"
+    FORMAT_VERSION = 1
+    COLUMNS = ("postdate", "security", "account", "cents")
+
+    def sidecar_path(self, ledger_path: str) -> str:
+        return ledger_path + self.SUFFIX
+
+    def load(self, ledger_path: str) -> Optional[DividendColumns]:
+        sidecar_path = self.sidecar_path(ledger_path)
+        if not os.path.exists(sidecar_path):
+            return None
+
+        try:
+            with open(sidecar_path, "rb") as f:
+                header = json.loads(f.readline())
+
+                if header.get("version") != self.FORMAT_VERSION or header.get("itemsize") != array("q").itemsize:
+                    return None
+
+                if not SidecarFile.is_current(header, ledger_path, description="Column cache"):
+                    return None
+
+                columns = {}
+                for name in self.COLUMNS:
+                    column = array("q")
+                    column.fromfile(f, header["length"])
+                    columns[name] = column
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning("Ignoring unreadable column cache %s: %s", sidecar_path, e)
+            return None
+
+        return DividendColumns(account_ids=header["account_ids"], **columns)
+
+    def store(self, ledger_path: str, columns: DividendColumns, *, source_stat: Tuple[int, int]) -> None:
+        """
+        Skipped if the ledger no longer has source_stat, its (size, mtime_ns) when the columns were read.
+        """
+        signature = SidecarFile.signature(ledger_path, expected_stat=source_stat)
+        if signature is None:
+            logger.info("%s changed while its columns were read; not caching them", ledger_path)
+            return
+
+        header = {
+            "version": self.FORMAT_VERSION,
+            **signature,
+            "itemsize": array("q").itemsize,
+            "length": len(columns),
+            "account_ids": columns.account_ids,
+        }
+
+        with SidecarFile.write(self.sidecar_path(ledger_path)) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                for name in self.COLUMNS:
+                    getattr(columns, name).tofile(f)
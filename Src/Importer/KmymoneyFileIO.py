@@ -0,0 +1,71 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+import gzip
+import os
+import shutil
+import tempfile
+
+
+class KmymoneyFileIO:
+    """
+    Opens KMyMoney files whether they are plain XML or gzip-compressed (.kmy).
+
+    Compression is detected from the gzip magic bytes, not from the extension,
+    because KMyMoney happily writes compressed data to files named .xml and vice versa.
+    Reads and writes go through gzip streams, so no uncompressed copy ever hits the disk.
+    """
+
+    GZIP_MAGIC = b"\x1f\x8b"
+    DEFAULT_COMPRESSION_LEVEL = 6
+
+    @staticmethod
+    def is_gzip(path: str) -> bool:
+        with open(path, "rb") as f:
+            return f.read(len(KmymoneyFileIO.GZIP_MAGIC)) == KmymoneyFileIO.GZIP_MAGIC
+
+    @staticmethod
+    def open_read(path: str) -> BinaryIO:
+        if KmymoneyFileIO.is_gzip(path):
+            return gzip.open(path, "rb")
+
+        return open(path, "rb")
+
+    @staticmethod
+    def open_write(
+        path: str,
+        *,
+        compressed: bool,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ) -> BinaryIO:
+        if compressed:
+            return gzip.open(path, "wb", compresslevel=compression_level)
+
+        return open(path, "wb")
+
+    @staticmethod
+    @contextmanager
+    def replace_atomically(path: str, *, prefix: str = ".kmymoney-") -> Iterator[str]:
+        """
+        Yields a temp path next to path; once the block succeeds the temp file replaces path.
+        On failure the temp file is removed and path is left untouched, so a half-written
+        file never takes the place of the original (which is often the file being read).
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=prefix,
+            suffix=".tmp",
+            dir=os.path.dirname(os.path.abspath(path)),
+        )
+        os.close(fd)
+
+        try:
+            if os.path.exists(path):
+                # mkstemp creates the file private; keep the permissions of the file it replaces
+                shutil.copymode(path, tmp_path)
+            yield tmp_path
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
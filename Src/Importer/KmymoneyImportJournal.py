@@ -0,0 +1,118 @@
+from __future__ import annotations
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence
+
+import json
+import logging
+import os
+
+from Importer.Model.DividendInsert import DividendInsert
+from Importer.Model.DividendRow import DividendRow
+
+logger = logging.getLogger(__name__)
+
+
+class KmymoneyImportJournal:
+    """
+    Append-only log of dividend transactions imported but not yet written into
+    the ledger (<ledger>.importer-journal.jsonl, one JSON object per line).
+
+    Appends are flushed and fsync'd before returning, so a journaled import
+    survives a crash and the ledger itself is never left half-written. Entries
+    carry no transaction id: ids are allocated when the journal is compacted into
+    the ledger, against whatever the ledger holds by then.
+
+    A torn last line (crash in the middle of an append) is ignored when reading.
+    """
+
+    SUFFIX = ".importer-journal.jsonl"
+    FORMAT_VERSION = 1
+
+    def __init__(self, ledger_path: str) -> None:
+        self.path = ledger_path + self.SUFFIX
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def append(self, batch: Sequence[DividendInsert]) -> None:
+        if not batch:
+            return
+
+        lines = "".join(json.dumps(self._to_raw(insert)) + "\n" for insert in batch)
+
+        if self.exists():
+            self._drop_torn_tail()
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self) -> List[DividendInsert]:
+        if not self.exists():
+            return []
+
+        inserts: List[DividendInsert] = []
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.endswith("\n"):
+                    logger.warning("Ignoring incomplete last entry of %s (line %d)", self.path, line_number)
+                    break
+
+                raw = json.loads(line)
+                if raw.get("version") != self.FORMAT_VERSION:
+                    raise ValueError(f"Unsupported journal entry version in {self.path} line {line_number}")
+
+                inserts.append(self._from_raw(raw))
+
+        return inserts
+
+    def _drop_torn_tail(self) -> None:
+        # Otherwise the next entry would be glued onto the partial line
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+    def clear(self) -> None:
+        if self.exists():
+            os.remove(self.path)
+
+    def _to_raw(self, insert: DividendInsert) -> Dict[str, Any]:
+        row = insert.row
+
+        return {
+            "version": self.FORMAT_VERSION,
+            "ticker": row.ticker,
+            "trans_date": row.trans_date.isoformat(),
+            "amount": str(row.amount),
+            "description": row.description,
+            "currency": row.currency,
+            "cash_account_id": insert.cash_account_id,
+            "security_account_id": insert.security_account_id,
+            "income_account_id": insert.income_account_id,
+        }
+
+    @staticmethod
+    def _from_raw(raw: Dict[str, Any]) -> DividendInsert:
+        return DividendInsert(
+            row=DividendRow(
+                ticker=raw["ticker"],
+                trans_date=date.fromisoformat(raw["trans_date"]),
+                amount=Decimal(raw["amount"]),
+                description=raw["description"],
+                currency=raw["currency"],
+            ),
+            cash_account_id=raw["cash_account_id"],
+            security_account_id=raw["security_account_id"],
+            income_account_id=raw["income_account_id"],
+        )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+
+import gzip
+import json
+import logging
+import os
+
+from Importer.Model.LedgerIndex import LedgerIndex
+from Importer.SidecarFile import SidecarFile
+
+logger = logging.getLogger(__name__)
+
+
+class KmymoneyIndexCache:
+    """
+    Persists a ledger's LedgerIndex in a sidecar file next to it
+    (<ledger>.importer-index.json.gz).
+
+    An entry is only trusted while SidecarFile.is_current holds for the ledger,
+    so any save by KMyMoney itself invalidates it. Hashing streams the file,
+    which is far cheaper than parsing it.
+    """
+
+    SUFFIX = ".importer-index.json.gz"
+    FORMAT_VERSION = 4
+
+    def sidecar_path(self, ledger_path: str) -> str:
+        return ledger_path + self.SUFFIX
+
+    def load(self, ledger_path: str) -> Optional[LedgerIndex]:
+        sidecar_path = self.sidecar_path(ledger_path)
+        if not os.path.exists(sidecar_path):
+            return None
+
+        try:
+            with gzip.open(sidecar_path, "rt", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable index cache %s: %s", sidecar_path, e)
+            return None
+
+        if raw.get("version") != self.FORMAT_VERSION:
+            return None
+
+        if not SidecarFile.is_current(raw, ledger_path, description="Index cache"):
+            return None
+
+        return LedgerIndex(
+            dividend_fingerprints={tuple(entry[:-1]): entry[-1] for entry in raw["dividend_fingerprints"]},
+            account_ids=raw["account_ids"],
+            max_transaction_number=raw["max_transaction_number"],
+            commodity_fractions=raw["commodity_fractions"],
+        )
+
+    def store(self, ledger_path: str, index: LedgerIndex, *, source_stat: Tuple[int, int]) -> None:
+        """
+        source_stat is the ledger's (size, mtime_ns) when the index was built; nothing
+        is stored if the ledger changed since, so the sidecar never pairs the two.
+        """
+        signature = SidecarFile.signature(ledger_path, expected_stat=source_stat)
+        if signature is None:
+            logger.info("%s changed while it was indexed; not caching the index", ledger_path)
+            return
+
+        raw: Dict[str, Any] = {
+            "version": self.FORMAT_VERSION,
+            **signature,
+            "max_transaction_number": index.max_transaction_number,
+            "account_ids": index.account_ids,
+            "commodity_fractions": index.commodity_fractions,
+            "dividend_fingerprints": sorted(
+                [*fingerprint, transaction_id]
+                for fingerprint, transaction_id in index.dividend_fingerprints.items()
+            ),
+        }
+
+        with SidecarFile.write(self.sidecar_path(ledger_path)) as tmp_path:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(raw, f)
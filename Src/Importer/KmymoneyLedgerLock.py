@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import Optional
+
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class KmymoneyLedgerLock:
+    """
+    Lock file (<ledger>.importer.lock) held while the importer writes a ledger,
+    so two importer processes never write the same file at once.
+
+    KMyMoney does not take this lock. Writers guard against it by checking right
+    before writing that the ledger is unchanged since it was loaded (see
+    KmymoneyXml.changed_on_disk) while holding the lock.
+
+    A lock left behind by a dead process on this host is taken over; any other
+    existing lock is waited on for up to timeout seconds.
+    """
+
+    SUFFIX = ".importer.lock"
+
+    def __init__(self, ledger_path: str, *, timeout: float = 30.0, poll_interval: float = 0.2) -> None:
+        self.lock_path = ledger_path + self.SUFFIX
+        self._timeout = timeout
+        self._poll_interval = poll_interval
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    def __enter__(self) -> "KmymoneyLedgerLock":
+        deadline = time.monotonic() + self._timeout
+
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._is_stale():
+                    logger.warning("Removing stale lock %s", self.lock_path)
+                    self._remove()
+                    continue
+
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"{self.lock_path} is held by another process; remove it if no import is running."
+                    )
+
+                time.sleep(self._poll_interval)
+                continue
+
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self._owner)
+
+            return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._remove()
+
+    def _remove(self) -> None:
+        try:
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+    def _is_stale(self) -> bool:
+        owner = self._read_owner()
+        if owner is None or os.name != "posix":
+            return False
+
+        host, _, pid_str = owner.rpartition(":")
+        if host != socket.gethostname() or not pid_str.isdigit():
+            return False
+
+        try:
+            os.kill(int(pid_str), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+
+        return False
+
+    def _read_owner(self) -> Optional[str]:
+        try:
+            with open(self.lock_path, "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
@@ -0,0 +1,143 @@
+from __future__ import annotations
+from typing import BinaryIO, Callable, List, Optional, Tuple
+
+import re
+import xml.etree.ElementTree as ElementTree
+
+from Importer.KmymoneyFileIO import KmymoneyFileIO
+
+
+class KmymoneySpliceWriter:
+    """
+    Writes a KMyMoney XML file by streaming the original bytes through unchanged
+    and splicing new <TRANSACTION> elements in front of the closing </TRANSACTIONS> tag
+    (an empty <TRANSACTIONS/> element is expanded around them).
+
+    Memory use stays flat (one chunk at a time) and the serialization cost depends
+    only on the number of new transactions, not on the ledger size.
+    Gzip-compressed sources are decompressed and recompressed on the fly.
+    """
+
+    CLOSING_TAG = b"</TRANSACTIONS>"
+    # Ledgers without transactions carry an empty element instead: <TRANSACTIONS count="0"/>
+    EMPTY_TAG_RE = re.compile(rb"<TRANSACTIONS(?:\s[^<>]*)?/>")
+    # Bytes held back between chunks so a tag split across them is still found
+    MAX_TAG_LENGTH = 256
+    CHUNK_SIZE = 1024 * 1024
+
+    # New transactions sit two levels deep: <KMYMONEY-FILE><TRANSACTIONS><TRANSACTION>
+    TRANSACTION_LEVEL = 2
+    INDENT = "  "
+
+    def write(
+        self,
+        source_path: str,
+        out_path: str,
+        new_transactions: List[ElementTree.Element],
+        *,
+        compressed: bool = False,
+        compression_level: int = KmymoneyFileIO.DEFAULT_COMPRESSION_LEVEL,
+        to_unicode: Optional[Callable[[ElementTree.Element], str]] = None,
+    ) -> None:
+        """
+        to_unicode serializes one element; defaults to the stdlib ElementTree
+        and must match the tree implementation the elements were built with.
+        """
+        payload = self._serialize(new_transactions, to_unicode or self._stdlib_to_unicode)
+
+        # Always go through a temp file: out_path is usually the file we are reading from.
+        with KmymoneyFileIO.replace_atomically(out_path) as tmp_path:
+            with KmymoneyFileIO.open_write(
+                tmp_path,
+                compressed=compressed,
+                compression_level=compression_level,
+            ) as out_file, KmymoneyFileIO.open_read(source_path) as in_file:
+                self._copy_with_splice(in_file, out_file, payload)
+
+    def _copy_with_splice(self, in_file: BinaryIO, out_file: BinaryIO, payload: bytes) -> None:
+        keep = self.MAX_TAG_LENGTH
+        pending = b""
+        spliced = False
+
+        while True:
+            chunk = in_file.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+
+            if spliced:
+                out_file.write(chunk)
+                continue
+
+            buffer = pending + chunk
+            position, end, opening_tag = self._find_splice_point(buffer)
+
+            if position >= 0:
+                out_file.write(buffer[:position])
+                if opening_tag is not None and payload:
+                    # A ledger without transactions: <TRANSACTIONS .../> becomes an open/close pair
+                    out_file.write(opening_tag + b"\n" + self.INDENT.encode("utf-8"))
+                    out_file.write(payload)
+                    out_file.write(self.CLOSING_TAG)
+                    out_file.write(buffer[end:])
+                else:
+                    out_file.write(payload)
+                    out_file.write(buffer[position:])
+                pending = b""
+                spliced = True
+                continue
+
+            # Hold back enough bytes to catch a tag split across two chunks.
+            out_file.write(buffer[:-keep])
+            pending = buffer[-keep:]
+
+        out_file.write(pending)
+
+        if not spliced:
+            raise ValueError("Could not find </TRANSACTIONS> in KMyMoney XML; cannot splice new transactions.")
+
+    def _find_splice_point(self, buffer: bytes) -> Tuple[int, int, Optional[bytes]]:
+        """
+        Returns (start, end, opening_tag) of the first closing or self-closing TRANSACTIONS tag.
+        For the closing tag, start == end (the payload goes in front of it) and opening_tag is None.
+        For the self-closing form, start..end covers the whole tag and opening_tag is its open form.
+        """
+        closing = buffer.find(self.CLOSING_TAG)
+        empty = self.EMPTY_TAG_RE.search(buffer, 0, closing if closing >= 0 else len(buffer))
+
+        if empty is not None:
+            return empty.start(), empty.end(), empty.group(0)[:-2].rstrip() + b">"
+        if closing >= 0:
+            return closing, closing, None
+        return -1, -1, None
+
+    @staticmethod
+    def _stdlib_to_unicode(elem: ElementTree.Element) -> str:
+        return ElementTree.tostring(elem, encoding="unicode")
+
+    def _serialize(
+        self,
+        new_transactions: List[ElementTree.Element],
+        to_unicode: Callable[[ElementTree.Element], str],
+    ) -> bytes:
+        parts: List[str] = []
+
+        for tx in new_transactions:
+            self._indent(tx, self.TRANSACTION_LEVEL)
+            tx.tail = None
+
+            body = to_unicode(tx)
+            parts.append(f"{self.INDENT}{body}\n{self.INDENT}")
+
+        return "".join(parts).encode("utf-8")
+
+    def _indent(self, elem: ElementTree.Element, level: int) -> None:
+        i = "\n" + level * self.INDENT
+        if len(elem):
+            if not elem.text or not elem.text.strip():
+                elem.text = i + self.INDENT
+            for child in elem:
+                self._indent(child, level + 1)
+            # Last child closes back to this element's indentation
+            elem[-1].tail = i
+        if not elem.tail or not elem.tail.strip():
+            elem.tail = i
@@ -1,11 +1,30 @@
 from __future__ import annotations
-from datetime import datetime
+from array import array
+from datetime import date, datetime
 from decimal import Decimal
+from bisect import bisect_left, insort
+from math import gcd
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+import logging
+import os
+import shutil
 import xml.etree.ElementTree as ElementTree
 import re
 
+from Importer.KmymoneyAmountConverter import KmymoneyAmountConverter
+from Importer.KmymoneyFileIO import KmymoneyFileIO
+from Importer.KmymoneyIndexCache import KmymoneyIndexCache
+from Importer.KmymoneySpliceWriter import KmymoneySpliceWriter
+from Importer.KmymoneyXmlBackend import KmymoneyXmlBackend
+from Importer.Model.DividendColumns import DividendColumns
+from Importer.Model.DividendInsert import DividendInsert
 from Importer.Model.DividendRow import DividendRow
+from Importer.Model.LedgerIndex import Fingerprint, LedgerIndex
+from Importer.Model.SecurityPrice import SecurityPrice
+from Importer.SidecarFile import SidecarFile
+
+logger = logging.getLogger(__name__)
 
 
 class KmymoneyXml:
@@ -15,50 +34,552 @@ class KmymoneyXml:
     Assumptions based on typical KMyMoney XML structure:
     - A <TRANSACTIONS> container exists
     - Transactions are <TRANSACTION ...> children
+    - The file is plain XML or gzip-compressed XML (.kmy); compressed files are
+      written back compressed
+
+    With an index_cache, a valid sidecar index replaces the load-time scan and the
+    XML tree is only parsed when something actually needs it (a full save).
+    Duplicate checks, id allocation and splice saves all work without it.
+
+    backend selects the tree implementation: "auto" uses lxml when it is installed
+    and falls back to the stdlib ElementTree otherwise (see KmymoneyXmlBackend).
+
+    scan_only=True builds the index with a single iterparse pass that discards each
+    element once it has been read, instead of materializing the whole document.
+    Pair it with save(splice=True) so the ledger never has to fit in memory as a DOM.
+
+    Duplicate checks can accept a postdate within +/- window_days of the row
+    (brokerages disagree on transaction vs settlement date). Those go through a
+    per-(security, cash account) list sorted by date, built on first use, so a
+    lookup is a bisection plus the dividends inside the window.
+
+    Amounts are written with the transaction currency's smallest account fraction,
+    read from <CURRENCIES>/<SECURITIES> ('1219/100' for CAD, '1219/1' for JPY);
+    commodities the file does not declare fall back to 100.
     """
 
     TX_ID_RE = re.compile(r"^T(\d+)$")
+    PRICE_SOURCE = "User"
+    # Decimal places for prices of securities without a usable 'pp' attribute
+    DEFAULT_PRICE_PRECISION = 4
+    # Reported as the match for dividends indexed without a ledger transaction yet
+    UNSAVED_TRANSACTION_ID = "(unsaved)"
 
-    def __init__(self, xml_path: str):
+    def __init__(
+        self,
+        xml_path: str,
+        *,
+        compression_level: int = KmymoneyFileIO.DEFAULT_COMPRESSION_LEVEL,
+        index_cache: Optional[KmymoneyIndexCache] = None,
+        backend: str = "auto",
+        scan_only: bool = False,
+    ):
         self.xml_path = xml_path
-        self.tree = ElementTree.parse(xml_path)
-        self.root = self.tree.getroot()
-        self.paths = self._locate_paths()
+        self._backend = KmymoneyXmlBackend.create(backend)
+        self.compressed = KmymoneyFileIO.is_gzip(xml_path)
+        self.compression_level = compression_level
+        self._source_stat = SidecarFile.stat_signature(xml_path)
+        self._index_cache = index_cache
+        self._tree: Optional[ElementTree.ElementTree] = None
+        self._paths: Optional[ElementTree.Element] = None
+        # Fingerprint -> id of the first transaction carrying it
+        self._dividend_index: Dict[Fingerprint, str] = {}
+        # (security number, cash number) -> sorted (postdate ordinal, numerator, denominator, id)
+        self._dividend_windows: Optional[Dict[Tuple[int, int], List[Tuple[int, int, int, str]]]] = None
+        self._account_numbers: Dict[str, int] = {}
+        self._date_ordinals: Dict[str, int] = {}
+        self._max_transaction_number = 0
+        self._new_transactions: List[ElementTree.Element] = []
+        self._amounts = KmymoneyAmountConverter()
+        # Built on first price import (needs the tree): existing (from, to, date) keys and pairs
+        self._price_index: Optional[Set[Tuple[str, str, str]]] = None
+        self._price_pairs: Dict[Tuple[str, str], ElementTree.Element] = {}
+        self._prices_changed = False
+
+        cached_index = index_cache.load(xml_path) if index_cache is not None else None
+        if cached_index is not None:
+            logger.info("Using cached ledger index for %s; XML parsing deferred", xml_path)
+            self._dividend_index = dict(cached_index.dividend_fingerprints)
+            self._account_numbers = {
+                account_id: number for number, account_id in enumerate(cached_index.account_ids)
+            }
+            self._max_transaction_number = cached_index.max_transaction_number
+            self._amounts = KmymoneyAmountConverter(cached_index.commodity_fractions)
+            return
+
+        if scan_only:
+            self._scan_stream()
+        else:
+            self._load_tree()
+            self._scan_commodities()
+            self._scan_transactions()
+
+        if index_cache is not None:
+            # Taken before parsing: a save by KMyMoney meanwhile must not be cached with this index
+            index_cache.store(xml_path, self.export_index(), source_stat=self._source_stat)
+
+    @property
+    def tree(self) -> ElementTree.ElementTree:
+        self._ensure_tree()
+        return self._tree
+
+    @property
+    def root(self) -> ElementTree.Element:
+        return self.tree.getroot()
+
+    @property
+    def paths(self) -> ElementTree.Element:
+        self._ensure_tree()
+        return self._paths
+
+    @property
+    def is_tree_loaded(self) -> bool:
+        return self._tree is not None
+
+    def export_index(self) -> LedgerIndex:
+        return LedgerIndex(
+            dividend_fingerprints=dict(self._dividend_index),
+            account_ids=list(self._account_numbers),
+            max_transaction_number=self._max_transaction_number,
+            commodity_fractions=self._amounts.fractions,
+        )
+
+    def _load_tree(self) -> None:
+        with KmymoneyFileIO.open_read(self.xml_path) as source:
+            self._tree = self._backend.parse(source)
+
+        self._paths = self._locate_paths()
+
+    def _ensure_tree(self) -> None:
+        if self._tree is not None:
+            return
+
+        # The cached index only describes the file as it was at construction time
+        if self.changed_on_disk():
+            raise ValueError(
+                f"{self.xml_path} changed on disk since its index was loaded; reload the ledger."
+            )
+
+        logger.info("Parsing %s", self.xml_path)
+        self._load_tree()
+
+        for tx in self._new_transactions:
+            self._paths.append(tx)
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
 
     def _locate_paths(self) -> ElementTree.Element:
-        # Common: <KMYMONEY-FILE> ... <TRANSACTIONS> ... <TRANSACTION/>
-        tx_root = self.root.find(".//TRANSACTIONS")
+        tx_root = self._backend.find_transactions_root(self._tree)
 
         if tx_root is None:
             raise ValueError("Could not find <TRANSACTIONS> in KMyMoney XML.")
 
         return tx_root
 
-    def save(self, out_path: str) -> None:
-        self._indent(self.root)
+    def _scan_commodities(self) -> None:
+        for commodity in self._backend.commodities(self._tree):
+            self._register_commodity(commodity)
+
+    def _register_commodity(self, commodity: ElementTree.Element) -> None:
+        commodity_id = commodity.get("id")
+        if commodity_id:
+            self._amounts.register(commodity_id, commodity.get("saf"))
+
+    def _scan_transactions(self) -> None:
+        """
+        Single pass over <TRANSACTIONS> done once at load time. Builds:
+        - The duplicate-detection index: (postdate, security account, cash account, amount)
+          for every transaction holding a 'Dividend' split on the security account,
+          paired with each split value found in the same transaction
+        - The set of used transaction ids and the highest numeric 'T...' id
+        """
+        for tx in self._backend.transactions(self.paths):
+            self._register_transaction_id(tx.get("id", ""))
+            self._index_transaction(self._dividend_index, tx)
+
+    def _scan_stream(self) -> None:
+        """
+        iterparse equivalent of _load_tree + _scan_transactions. Each child of a
+        top-level section (<TRANSACTION>, <PRICEPAIR>, <PAYEE>, ...) is dropped as soon
+        as it ends, after transactions were indexed and commodity fractions read out of
+        <CURRENCIES> and <SECURITIES>, so memory stays bounded by one such element.
+        """
+        depth = 0
+        root = None
+        section = None
+        tx_root = None
+
+        with KmymoneyFileIO.open_read(self.xml_path) as source:
+            for event, elem in self._backend.iterparse(source):
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        root = elem
+                    elif depth == 2:
+                        section = elem
+                        if elem.tag == "TRANSACTIONS":
+                            tx_root = elem
+                    continue
+
+                depth -= 1
+
+                if depth == 2:
+                    if elem.tag == "TRANSACTION" and section is tx_root:
+                        self._register_transaction_id(elem.get("id", ""))
+                        self._index_transaction(self._dividend_index, elem)
+                    elif elem.tag in ("CURRENCY", "SECURITY"):
+                        self._register_commodity(elem)
+                    section.clear()
+                elif depth == 1:
+                    root.clear()
 
-        xml_body = ElementTree.tostring(
-            self.root,
-            encoding="utf-8",
-            xml_declaration=True
-        ).decode("utf-8")
+        if tx_root is None:
+            raise ValueError("Could not find <TRANSACTIONS> in KMyMoney XML.")
 
-        doctype = "<!DOCTYPE KMYMONEY-FILE>\n"
+    def _register_transaction_id(self, tx_id: str) -> None:
+        # Only the high-water mark is kept: every id at or below it counts as taken
+        m = self.TX_ID_RE.match(tx_id)
+        if m:
+            self._max_transaction_number = max(self._max_transaction_number, int(m.group(1)))
 
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(xml_body.replace("\n<KMYMONEY-FILE>", f"\n{doctype}<KMYMONEY-FILE>", 1))
+    def _index_transaction(
+        self,
+        index: Dict[Fingerprint, str],
+        tx: ElementTree.Element,
+    ) -> None:
+        postdate = self._date_ordinal(tx.get("postdate"))
+        if postdate is None:
+            return
+
+        tx_id = tx.get("id", "")
+        splits = self._backend.splits(tx)
+        security_account_ids = [
+            s.get("account")
+            for s in splits
+            if s.get("action") == "Dividend" and s.get("account") is not None
+        ]
+        if not security_account_ids:
+            return
+
+        for security_account_id in security_account_ids:
+            security_number = self._account_number(security_account_id)
+
+            for s in splits:
+                account_id = s.get("account")
+                value = self._parse_rational(s.get("value"))
+                if account_id is None or value is None:
+                    continue
+
+                index.setdefault(
+                    (postdate, security_number, self._account_number(account_id), value[0], value[1]),
+                    tx_id,
+                )
+
+    def dividend_columns(self) -> DividendColumns:
+        """
+        Extracts the splits of every dividend transaction into columns for analytics
+        (see DividendColumns). Walks the tree once, parsing it first if it was deferred.
+        """
+        postdates = array("q")
+        securities = array("q")
+        accounts = array("q")
+        cents = array("q")
+
+        for tx in self._backend.transactions(self.paths):
+            postdate = self._date_ordinal(tx.get("postdate"))
+            if postdate is None:
+                continue
 
-    def next_transaction_id(self) -> str:
-        max_num = 0
-        for tx in self.paths.findall("./TRANSACTION"):
-            tx_id = tx.get("id", "")
-            m = self.TX_ID_RE.match(tx_id)
+            splits = self._backend.splits(tx)
+            security_account_id = next(
+                (s.get("account") for s in splits if s.get("action") == "Dividend" and s.get("account") is not None),
+                None,
+            )
+            if security_account_id is None:
+                continue
+
+            security_number = self._account_number(security_account_id)
+
+            for s in splits:
+                account_id = s.get("account")
+                value = self._parse_rational(s.get("value"))
+                if account_id is None or value is None or s.get("action") == "Dividend":
+                    continue
+
+                numerator, denominator = value
+                postdates.append(postdate)
+                securities.append(security_number)
+                accounts.append(self._account_number(account_id))
+                cents.append((numerator * 200 + denominator) // (2 * denominator))
+
+        return DividendColumns(
+            account_ids=list(self._account_numbers),
+            postdate=postdates,
+            security=securities,
+            account=accounts,
+            cents=cents,
+        )
+
+    def _account_number(self, account_id: str) -> int:
+        number = self._account_numbers.get(account_id)
+        if number is None:
+            number = len(self._account_numbers)
+            self._account_numbers[account_id] = number
+
+        return number
+
+    def _date_ordinal(self, postdate: Optional[str]) -> Optional[int]:
+        if postdate is None:
+            return None
+
+        # Ledgers hold many transactions per day; parse each distinct date once
+        ordinal = self._date_ordinals.get(postdate)
+        if ordinal is None:
+            try:
+                ordinal = date.fromisoformat(postdate).toordinal()
+            except ValueError:
+                return None
+            self._date_ordinals[postdate] = ordinal
+
+        return ordinal
+
+    @staticmethod
+    def _parse_rational(value: Optional[str]) -> Optional[Tuple[int, int]]:
+        """
+        Parses a KMyMoney 'n/d' value into a reduced (numerator, denominator) pair.
+        """
+        if value is None:
+            return None
+
+        numerator_str, _, denominator_str = value.partition("/")
+        try:
+            numerator = int(numerator_str)
+            denominator = int(denominator_str) if denominator_str else 1
+        except ValueError:
+            return None
+
+        if denominator == 0:
+            return None
+
+        if denominator < 0:
+            numerator, denominator = -numerator, -denominator
+
+        divisor = gcd(numerator, denominator)
+        return numerator // divisor, denominator // divisor
+
+    def save(self, out_path: str, *, splice: bool = False) -> None:
+        """
+        Writes the ledger to out_path.
+
+        splice=False re-serializes and pretty-prints the whole tree.
+        splice=True streams the original file bytes through and only serializes
+        the transactions added since load (see KmymoneySpliceWriter).
+        Either way the output is gzip-compressed if the source was.
+
+        Saving over xml_path itself makes the written file the new baseline: the
+        transactions added so far count as part of the source from then on.
+        Both modes refuse to write once xml_path changed on disk since it was loaded;
+        callers that may race another importer hold a KmymoneyLedgerLock around save.
+        """
+        if splice and self._prices_changed:
+            raise ValueError("Prices were added to the ledger; they can only be written by a full save (no splice).")
+
+        if splice:
+            self._save_spliced(out_path)
+        elif not self.is_tree_loaded and not self._new_transactions:
+            self._save_unchanged(out_path)
+        else:
+            self._save_full(out_path)
+
+        written_stat = SidecarFile.stat_signature(out_path)
+
+        if os.path.abspath(out_path) == os.path.abspath(self.xml_path):
+            self._source_stat = written_stat
+            self._new_transactions = []
+
+        if self._index_cache is not None:
+            self._index_cache.store(out_path, self.export_index(), source_stat=written_stat)
+
+    def _save_unchanged(self, out_path: str) -> None:
+        # Nothing was added and the tree was never parsed: the file is already the output
+        if os.path.abspath(out_path) != os.path.abspath(self.xml_path):
+            shutil.copyfile(self.xml_path, out_path)
+
+    def _save_full(self, out_path: str) -> None:
+        # Parse a deferred tree before anything is written: out_path is usually xml_path itself
+        tree = self.tree
+
+        # Writing the tree back would silently drop whatever the other writer saved
+        if self.changed_on_disk():
+            raise ValueError(
+                f"{self.xml_path} changed on disk since it was loaded; refusing to overwrite it."
+            )
+
+        with KmymoneyFileIO.replace_atomically(out_path) as tmp_path:
+            with KmymoneyFileIO.open_write(
+                tmp_path,
+                compressed=self.compressed,
+                compression_level=self.compression_level,
+            ) as f:
+                self._backend.write_document(tree, f)
+
+    def _save_spliced(self, out_path: str) -> None:
+        if self.changed_on_disk():
+            raise ValueError(
+                f"{self.xml_path} changed on disk since it was loaded; refusing to splice into it."
+            )
+
+        KmymoneySpliceWriter().write(
+            self.xml_path,
+            out_path,
+            self._new_transactions,
+            compressed=self.compressed,
+            compression_level=self.compression_level,
+            to_unicode=self._backend.to_unicode,
+        )
+
+    def changed_on_disk(self) -> bool:
+        """
+        True if xml_path was written by something else since it was loaded (or last saved in place).
+        """
+        return SidecarFile.stat_signature(self.xml_path) != self._source_stat
+
+    @property
+    def source_stat(self) -> Tuple[int, int]:
+        """
+        (size, mtime_ns) of xml_path as it was loaded (or last saved in place).
+        """
+        return self._source_stat
+
+    def securities_by_symbol(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        Upper-cased <SECURITY symbol> -> (security id, trading currency id or None).
+        """
+        securities: Dict[str, Tuple[str, Optional[str]]] = {}
+
+        for commodity in self._backend.commodities(self.tree):
+            symbol = commodity.get("symbol")
+            security_id = commodity.get("id")
+            if commodity.tag != "SECURITY" or not symbol or not security_id:
+                continue
+
+            securities.setdefault(symbol.strip().upper(), (security_id, commodity.get("trading-currency")))
+
+        return securities
+
+    def add_prices(self, prices: Sequence[SecurityPrice]) -> List[SecurityPrice]:
+        """
+        Bulk-inserts prices into <PRICES>, one <PRICE> per (security, currency, date):
+        - Prices already in the ledger, or earlier in the batch, are skipped (the
+          existing one wins); the (from, to, date) index is built once per ledger
+        - Missing <PRICEPAIR> (and <PRICES>) elements are created
+        - Values are rounded to the security's price precision ('pp' decimals)
+
+        Returns the prices actually added. Only a full save writes them.
+        """
+        self._ensure_price_index()
+        prices_root = self._backend.find_prices_root(self.tree)
+        if prices_root is None:
+            prices_root = self._backend.sub_element(self.root, "PRICES", {"count": "0"})
+
+        precisions = self._price_precisions()
+        added: List[SecurityPrice] = []
+
+        for price in prices:
+            price_date = price.price_date.isoformat()
+            key = (price.security_id, price.currency_id, price_date)
+            if key in self._price_index:
+                continue
+
+            pair_key = (price.security_id, price.currency_id)
+            pair = self._price_pairs.get(pair_key)
+            if pair is None:
+                pair = self._backend.sub_element(
+                    prices_root,
+                    "PRICEPAIR",
+                    {"from": price.security_id, "to": price.currency_id},
+                )
+                self._price_pairs[pair_key] = pair
+
+            self._backend.sub_element(
+                pair,
+                "PRICE",
+                {
+                    "date": price_date,
+                    "price": self._price_rational(
+                        price.price,
+                        precisions.get(price.security_id, self.DEFAULT_PRICE_PRECISION),
+                    ),
+                    "source": self.PRICE_SOURCE,
+                },
+            )
+            self._price_index.add(key)
+            added.append(price)
+
+        if added:
+            prices_root.set("count", str(len(self._price_pairs)))
+            self._prices_changed = True
 
-            if m:
-                max_num = max(max_num, int(m.group(1)))
+        return added
+
+    def _ensure_price_index(self) -> None:
+        if self._price_index is not None:
+            return
+
+        self._price_index = set()
+        prices_root = self._backend.find_prices_root(self.tree)
+        if prices_root is None:
+            return
+
+        for pair in self._backend.price_pairs(prices_root):
+            pair_key = (pair.get("from", ""), pair.get("to", ""))
+            self._price_pairs.setdefault(pair_key, pair)
+
+            for price in self._backend.prices(pair):
+                self._price_index.add((pair_key[0], pair_key[1], price.get("date", "")))
+
+    def _price_precisions(self) -> Dict[str, int]:
+        precisions: Dict[str, int] = {}
+
+        for commodity in self._backend.commodities(self.tree):
+            try:
+                precision = int(commodity.get("pp", ""))
+            except ValueError:
+                continue
+
+            # Currencies sometimes carry a fraction (100) here rather than a digit count
+            if 0 <= precision <= 10:
+                precisions[commodity.get("id", "")] = precision
+
+        return precisions
+
+    @staticmethod
+    def _price_rational(value: Decimal, precision: int) -> str:
+        scale = 10 ** precision
+        units = int((value * scale).to_integral_value())
+        divisor = gcd(units, scale)
+
+        return f"{units // divisor}/{scale // divisor}"
+
+    def next_transaction_id(self) -> str:
+        """
+        Allocates the next id from the high-water mark computed at load time.
+        """
+        self._max_transaction_number += 1
 
         # Keep KMyMoney-style padding: "T000000000000023867"
-        return f"T{max_num + 1:018d}"
+        return f"T{self._max_transaction_number:018d}"
+
+    def allocate_transaction_ids(self, count: int) -> List[str]:
+        """
+        Allocates count contiguous ids above the high-water mark in one step.
+        """
+        first = self._max_transaction_number + 1
+        self._max_transaction_number += count
+
+        return [f"T{number:018d}" for number in range(first, first + count)]
 
     def has_duplicate_dividend(
         self,
@@ -67,35 +588,127 @@ class KmymoneyXml:
         security_account_id: str,
         amount: Decimal,
         cash_account_id: str,
+        commodity_id: Optional[str] = None,
+        window_days: int = 0,
     ) -> bool:
         """
-        Simple duplicate heuristic:
-        - Same postdate
+        Simple duplicate heuristic, answered from the load-time index:
+        - Same postdate, or within +/- window_days of it
         - Has a split with action='Dividend' on the security account
-        - Has cash split in cash account with matching amount
+        - Has cash split in cash account with matching amount, rounded to the
+          commodity's fraction (the row's currency)
+        """
+        return self.find_duplicate_dividend(
+            postdate=postdate,
+            security_account_id=security_account_id,
+            amount=amount,
+            cash_account_id=cash_account_id,
+            commodity_id=commodity_id,
+            window_days=window_days,
+        ) is not None
+
+    def find_duplicate_dividend(
+        self,
+        *,
+        postdate: str,
+        security_account_id: str,
+        amount: Decimal,
+        cash_account_id: str,
+        commodity_id: Optional[str] = None,
+        window_days: int = 0,
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Like has_duplicate_dividend, but returns (transaction id, days apart) of the
+        matching dividend, preferring the closest postdate, or None.
         """
-        target_amt = self._decimal_to_kmm_rational(amount)
+        fingerprint = self._fingerprint(postdate, security_account_id, cash_account_id, amount, commodity_id)
+        if fingerprint is None:
+            return None
 
-        for tx in self.paths.findall("./TRANSACTION"):
-            if tx.get("postdate") != postdate:
-                continue
+        transaction_id = self._dividend_index.get(fingerprint)
+        if transaction_id is not None or window_days <= 0:
+            return (transaction_id, 0) if transaction_id is not None else None
 
-            splits = tx.findall("./SPLITS/SPLIT")
-            saw_security_div = any(
-                (s.get("account") == security_account_id and s.get("action") == "Dividend")
-                for s in splits
-            )
-            if not saw_security_div:
+        ordinal, security_number, cash_number, numerator, denominator = fingerprint
+        entries = self._windows().get((security_number, cash_number))
+        if not entries:
+            return None
+
+        best: Optional[Tuple[str, int]] = None
+        i = bisect_left(entries, (ordinal - window_days,))
+
+        while i < len(entries) and entries[i][0] <= ordinal + window_days:
+            entry_ordinal, entry_numerator, entry_denominator, entry_id = entries[i]
+            i += 1
+
+            if entry_numerator != numerator or entry_denominator != denominator:
                 continue
 
-            saw_cash = any(
-                (s.get("account") == cash_account_id and s.get("value") == target_amt)
-                for s in splits
-            )
-            if saw_cash:
-                return True
+            days_apart = entry_ordinal - ordinal
+            if best is None or abs(days_apart) < abs(best[1]):
+                best = (entry_id, days_apart)
+
+        return best
+
+    def _windows(self) -> Dict[Tuple[int, int], List[Tuple[int, int, int, str]]]:
+        if self._dividend_windows is None:
+            windows: Dict[Tuple[int, int], List[Tuple[int, int, int, str]]] = {}
+
+            for (ordinal, security_number, cash_number, numerator, denominator), transaction_id in (
+                self._dividend_index.items()
+            ):
+                windows.setdefault((security_number, cash_number), []).append(
+                    (ordinal, numerator, denominator, transaction_id)
+                )
+
+            for entries in windows.values():
+                entries.sort()
+
+            self._dividend_windows = windows
+
+        return self._dividend_windows
+
+    def dividend_fingerprint(
+        self,
+        *,
+        postdate: str,
+        security_account_id: str,
+        cash_account_id: str,
+        amount: Decimal,
+        commodity_id: Optional[str] = None,
+    ) -> Optional[Fingerprint]:
+        """
+        The key index_dividends would file this dividend under, so callers can spot
+        repeats within a batch that is not indexed yet. Unlike lookups, accounts the
+        ledger does not use yet get a number, as they would when indexed.
+        """
+        self._account_number(security_account_id)
+        self._account_number(cash_account_id)
+
+        return self._fingerprint(postdate, security_account_id, cash_account_id, amount, commodity_id)
+
+    def _fingerprint(
+        self,
+        postdate: str,
+        security_account_id: str,
+        cash_account_id: str,
+        amount: Decimal,
+        commodity_id: Optional[str] = None,
+    ) -> Optional[Fingerprint]:
+        """
+        Builds the index key for a row, or None if it cannot match anything indexed.
+        The amount is rounded exactly as add_dividend_transaction writes it.
+        """
+        postdate_ordinal = self._date_ordinal(postdate)
+        security_number = self._account_numbers.get(security_account_id)
+        cash_number = self._account_numbers.get(cash_account_id)
+
+        if postdate_ordinal is None or security_number is None or cash_number is None:
+            return None
 
-        return False
+        numerator, denominator = self._amounts.to_reduced(amount, commodity_id)
+
+        return postdate_ordinal, security_number, cash_number, numerator, denominator
 
     def add_dividend_transaction(
         self,
@@ -112,12 +725,101 @@ class KmymoneyXml:
           2) Security account: action='Dividend', value 0 (or amount, depends on prefs; we keep 0)
           3) Income account: -amount
         """
+        insert = DividendInsert(
+            row=row,
+            cash_account_id=cash_account_id,
+            security_account_id=security_account_id,
+            income_account_id=income_account_id,
+        )
+
+        self._append_transactions([insert], [transaction_id], self._kmm_datetime_now())
+
+    def add_dividend_transactions(self, batch: Sequence[DividendInsert]) -> List[str]:
+        """
+        Bulk form of add_dividend_transaction:
+        - Ids are allocated as one contiguous range (see allocate_transaction_ids)
+        - Every transaction in the batch shares one entry timestamp
+        - Elements are appended to the ledger and the index updated in one go
+
+        Returns the created transaction ids, in batch order.
+        """
+        transaction_ids = self.allocate_transaction_ids(len(batch))
+        self._append_transactions(batch, transaction_ids, self._kmm_datetime_now())
+
+        return transaction_ids
+
+    def index_dividends(
+        self,
+        batch: Sequence[DividendInsert],
+        transaction_ids: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Makes has_duplicate_dividend see these dividends without adding them to the
+        ledger, e.g. transactions still waiting in a KmymoneyImportJournal
+        (reported with UNSAVED_TRANSACTION_ID as their id).
+        """
+        if transaction_ids is None:
+            transaction_ids = [self.UNSAVED_TRANSACTION_ID] * len(batch)
+
+        fingerprints = []
+
+        for insert in batch:
+            row = insert.row
+            self._account_number(insert.security_account_id)
+            self._account_number(insert.cash_account_id)
+            fingerprints.append(
+                self._fingerprint(
+                    row.trans_date.isoformat(),
+                    insert.security_account_id,
+                    insert.cash_account_id,
+                    row.amount,
+                    row.currency,
+                )
+            )
+
+        for fingerprint, transaction_id in zip(fingerprints, transaction_ids):
+            if fingerprint is None or fingerprint in self._dividend_index:
+                continue
+
+            self._dividend_index[fingerprint] = transaction_id
+
+            if self._dividend_windows is not None:
+                ordinal, security_number, cash_number, numerator, denominator = fingerprint
+                insort(
+                    self._dividend_windows.setdefault((security_number, cash_number), []),
+                    (ordinal, numerator, denominator, transaction_id),
+                )
+
+    def _append_transactions(
+        self,
+        batch: Sequence[DividendInsert],
+        transaction_ids: List[str],
+        now: str,
+    ) -> None:
+        transactions = []
+
+        for insert, transaction_id in zip(batch, transaction_ids):
+            logger.debug("Adding dividend transaction %s: %s", transaction_id, insert.row)
+            transactions.append(
+                self._build_dividend_transaction(insert, transaction_id, insert.row.trans_date.isoformat(), now)
+            )
+
+        if self.is_tree_loaded:
+            self._paths.extend(transactions)
 
-        print(f"Adding dividend transaction: {row}")
-        postdate = row.trans_date.isoformat()
-        now = self._kmm_datetime_now()
+        self._new_transactions.extend(transactions)
+        self.index_dividends(batch, transaction_ids)
 
-        tx = ElementTree.Element(
+    def _build_dividend_transaction(
+        self,
+        insert: DividendInsert,
+        transaction_id: str,
+        postdate: str,
+        now: str,
+    ) -> ElementTree.Element:
+        row = insert.row
+
+        tx = self._backend.element(
             "TRANSACTION",
             {
                 "id": transaction_id,
@@ -129,17 +831,16 @@ class KmymoneyXml:
             },
         )
 
-        splits_el = ElementTree.SubElement(tx, "SPLITS")
-        amt = self._decimal_to_kmm_rational(row.amount)
-        neg_amt = self._decimal_to_kmm_rational(-row.amount)
+        splits_el = self._backend.sub_element(tx, "SPLITS", {})
+        amt, neg_amt = self._amounts.to_rationals((row.amount, -row.amount), row.currency)
 
         # Split 1: cash +amount
-        ElementTree.SubElement(
+        self._backend.sub_element(
             splits_el,
             "SPLIT",
             {
                 "id": "S0001",
-                "account": cash_account_id,
+                "account": insert.cash_account_id,
                 "value": amt,
                 "shares": amt,
                 "memo": row.description,
@@ -147,12 +848,12 @@ class KmymoneyXml:
         )
 
         # Split 2: security action Dividend (value often 0; keep explicit Dividend tag)
-        ElementTree.SubElement(
+        self._backend.sub_element(
             splits_el,
             "SPLIT",
             {
                 "id": "S0002",
-                "account": security_account_id,
+                "account": insert.security_account_id,
                 "value": "0/1",
                 "shares": "0/1",
                 "action": "Dividend",
@@ -161,42 +862,27 @@ class KmymoneyXml:
         )
 
         # Split 3: income -amount
-        ElementTree.SubElement(
+        self._backend.sub_element(
             splits_el,
             "SPLIT",
             {
                 "id": "S0003",
-                "account": income_account_id,
+                "account": insert.income_account_id,
                 "value": neg_amt,
                 "shares": neg_amt,
                 "memo": row.description,
             },
         )
 
-        self.paths.append(tx)
+        return tx
 
-    def _decimal_to_kmm_rational(self, value: Decimal) -> str:
+    def decimals_to_kmm_rationals(self, values: Iterable[Decimal], commodity_id: Optional[str] = None) -> List[str]:
         """
-        Converts Decimal dollars to a rational like '1219/100' for cents.
-        Assumes 2 decimal places for CAD/USD style currencies.
+        Converts a column of Decimal amounts to rationals in the commodity's fraction,
+        e.g. '1219/100' for 12.19 CAD. See KmymoneyAmountConverter.
         """
-        cents = int((value * Decimal("100")).to_integral_value())
-        return f"{cents}/100"
+        return self._amounts.to_rationals(values, commodity_id)
 
     def _kmm_datetime_now(self) -> str:
         # Often KMyMoney uses: YYYY-MM-DDThh:mm:ss
         return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-
-    def _indent(self, elem: ElementTree.Element, level: int = 0) -> None:
-        # Pretty printing for readability
-        i = "\n" + level * "  "
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = i + "  "
-            for child in elem:
-                self._indent(child, level + 1)
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = i
-        else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = i
@@ -0,0 +1,249 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import logging
+import xml.etree.ElementTree as ElementTree
+
+try:
+    from lxml import etree as LxmlEtree
+except ImportError:  # lxml is optional; the stdlib backend covers everything
+    LxmlEtree = None
+
+logger = logging.getLogger(__name__)
+
+
+class KmymoneyXmlBackend(ABC):
+    """
+    The tree operations KmymoneyXml needs, so it can run on the stdlib
+    ElementTree or, when installed, on lxml.
+
+    Implementations:
+    - StdlibXmlBackend
+    - LxmlXmlBackend
+    """
+
+    DOCTYPE = "<!DOCTYPE KMYMONEY-FILE>"
+
+    name = ""
+
+    @staticmethod
+    def create(name: str = "auto") -> "KmymoneyXmlBackend":
+        """
+        name: "auto" (lxml if importable, else stdlib), "lxml" or "stdlib".
+        """
+        if name == "stdlib":
+            return StdlibXmlBackend()
+
+        if name == "lxml":
+            if LxmlEtree is None:
+                raise ValueError("The lxml XML backend was requested but lxml is not installed.")
+            return LxmlXmlBackend()
+
+        if name == "auto":
+            if LxmlEtree is not None:
+                return LxmlXmlBackend()
+
+            logger.debug("lxml not available, using the stdlib XML backend")
+            return StdlibXmlBackend()
+
+        raise ValueError(f"Unknown XML backend: {name}. Supported: auto, lxml, stdlib")
+
+    @abstractmethod
+    def parse(self, source: BinaryIO) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iterparse(self, source: BinaryIO) -> Iterator[Tuple[str, Any]]:
+        """
+        Streams ("start" | "end", element) events without keeping a document around
+        beyond what the caller leaves attached.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_transactions_root(self, tree: Any) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def commodities(self, tree: Any) -> List[Any]:
+        """
+        All <CURRENCY> and <SECURITY> elements, which carry each commodity's fractions.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_prices_root(self, tree: Any) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def price_pairs(self, prices_root: Any) -> List[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def prices(self, price_pair: Any) -> List[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def transactions(self, tx_root: Any) -> List[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def splits(self, tx: Any) -> List[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def element(self, tag: str, attrib: Dict[str, str]) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def sub_element(self, parent: Any, tag: str, attrib: Dict[str, str]) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def to_unicode(self, elem: Any) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_document(self, tree: Any, out_file: BinaryIO) -> None:
+        """
+        Writes the whole document (declaration, DOCTYPE, pretty-printed tree) as UTF-8.
+        """
+        raise NotImplementedError
+
+
+class StdlibXmlBackend(KmymoneyXmlBackend):
+    name = "stdlib"
+
+    def parse(self, source: BinaryIO) -> Any:
+        return ElementTree.parse(source)
+
+    def iterparse(self, source: BinaryIO) -> Iterator[Tuple[str, Any]]:
+        return ElementTree.iterparse(source, events=("start", "end"))
+
+    def find_transactions_root(self, tree: Any) -> Optional[Any]:
+        # Common: <KMYMONEY-FILE> ... <TRANSACTIONS> ... <TRANSACTION/>
+        return tree.getroot().find(".//TRANSACTIONS")
+
+    def commodities(self, tree: Any) -> List[Any]:
+        root = tree.getroot()
+        return root.findall("./CURRENCIES/CURRENCY") + root.findall("./SECURITIES/SECURITY")
+
+    def find_prices_root(self, tree: Any) -> Optional[Any]:
+        return tree.getroot().find("./PRICES")
+
+    def price_pairs(self, prices_root: Any) -> List[Any]:
+        return prices_root.findall("./PRICEPAIR")
+
+    def prices(self, price_pair: Any) -> List[Any]:
+        return price_pair.findall("./PRICE")
+
+    def transactions(self, tx_root: Any) -> List[Any]:
+        return tx_root.findall("./TRANSACTION")
+
+    def splits(self, tx: Any) -> List[Any]:
+        return tx.findall("./SPLITS/SPLIT")
+
+    def element(self, tag: str, attrib: Dict[str, str]) -> Any:
+        return ElementTree.Element(tag, attrib)
+
+    def sub_element(self, parent: Any, tag: str, attrib: Dict[str, str]) -> Any:
+        return ElementTree.SubElement(parent, tag, attrib)
+
+    def to_unicode(self, elem: Any) -> str:
+        return ElementTree.tostring(elem, encoding="unicode")
+
+    def write_document(self, tree: Any, out_file: BinaryIO) -> None:
+        root = tree.getroot()
+        self._indent(root)
+
+        xml_body = ElementTree.tostring(
+            root,
+            encoding="utf-8",
+            xml_declaration=True
+        ).decode("utf-8")
+
+        # ElementTree drops the DOCTYPE on parse, so put it back by hand
+        doctype = f"{self.DOCTYPE}\n"
+        document = xml_body.replace("\n<KMYMONEY-FILE>", f"\n{doctype}<KMYMONEY-FILE>", 1)
+
+        out_file.write(document.encode("utf-8"))
+
+    def _indent(self, elem: ElementTree.Element, level: int = 0) -> None:
+        # Pretty printing for readability
+        i = "\n" + level * "  "
+        if len(elem):
+            if not elem.text or not elem.text.strip():
+                elem.text = i + "  "
+            for child in elem:
+                self._indent(child, level + 1)
+            if not elem.tail or not elem.tail.strip():
+                elem.tail = i
+        else:
+            if level and (not elem.tail or not elem.tail.strip()):
+                elem.tail = i
+
+
+class LxmlXmlBackend(KmymoneyXmlBackend):
+    """
+    C-accelerated parsing and serialization with XPath queries compiled once.
+    lxml keeps the parsed DOCTYPE itself, so no string patching is needed on save.
+    """
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        self._parser = LxmlEtree.XMLParser(huge_tree=True)
+        self._transactions_root_xpath = LxmlEtree.XPath("//TRANSACTIONS")
+        self._transactions_xpath = LxmlEtree.XPath("./TRANSACTION")
+        self._commodities_xpath = LxmlEtree.XPath("/*/CURRENCIES/CURRENCY | /*/SECURITIES/SECURITY")
+        self._prices_root_xpath = LxmlEtree.XPath("/*/PRICES")
+        self._price_pairs_xpath = LxmlEtree.XPath("./PRICEPAIR")
+        self._prices_xpath = LxmlEtree.XPath("./PRICE")
+        self._splits_xpath = LxmlEtree.XPath("./SPLITS/SPLIT")
+
+    def parse(self, source: BinaryIO) -> Any:
+        return LxmlEtree.parse(source, self._parser)
+
+    def iterparse(self, source: BinaryIO) -> Iterator[Tuple[str, Any]]:
+        return LxmlEtree.iterparse(source, events=("start", "end"), huge_tree=True)
+
+    def find_transactions_root(self, tree: Any) -> Optional[Any]:
+        matches = self._transactions_root_xpath(tree)
+        return matches[0] if matches else None
+
+    def commodities(self, tree: Any) -> List[Any]:
+        return self._commodities_xpath(tree)
+
+    def find_prices_root(self, tree: Any) -> Optional[Any]:
+        matches = self._prices_root_xpath(tree)
+        return matches[0] if matches else None
+
+    def price_pairs(self, prices_root: Any) -> List[Any]:
+        return self._price_pairs_xpath(prices_root)
+
+    def prices(self, price_pair: Any) -> List[Any]:
+        return self._prices_xpath(price_pair)
+
+    def transactions(self, tx_root: Any) -> List[Any]:
+        return self._transactions_xpath(tx_root)
+
+    def splits(self, tx: Any) -> List[Any]:
+        return self._splits_xpath(tx)
+
+    def element(self, tag: str, attrib: Dict[str, str]) -> Any:
+        return LxmlEtree.Element(tag, attrib)
+
+    def sub_element(self, parent: Any, tag: str, attrib: Dict[str, str]) -> Any:
+        return LxmlEtree.SubElement(parent, tag, attrib)
+
+    def to_unicode(self, elem: Any) -> str:
+        return LxmlEtree.tostring(elem, encoding="unicode")
+
+    def write_document(self, tree: Any, out_file: BinaryIO) -> None:
+        LxmlEtree.indent(tree, space="  ")
+
+        # Only add a DOCTYPE when the source had none, like the stdlib path always does
+        doctype = None if tree.docinfo.doctype else self.DOCTYPE
+
+        tree.write(out_file, encoding="utf-8", xml_declaration=True, doctype=doctype)
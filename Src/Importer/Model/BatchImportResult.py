@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+from Importer.Model.ImportResult import ImportResult
+from Importer.Model.StageTiming import StageTiming
+
+
+@dataclass(frozen=True)
+class BatchImportResult:
+    results_by_input: Dict[str, ImportResult]
+    # Ledger-level stages shared by every input (load, save)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+
+    @property
+    def total(self) -> ImportResult:
+        return ImportResult(
+            imported_count=sum(r.imported_count for r in self.results_by_input.values()),
+            skipped_count=sum(r.skipped_count for r in self.results_by_input.values()),
+            duplicate_count=sum(r.duplicate_count for r in self.results_by_input.values()),
+            already_processed_count=sum(r.already_processed_count for r in self.results_by_input.values()),
+        )
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class CsvColumnPlan:
+    """
+    Column positions resolved once from a CSV header row: for each field, the
+    positions of its candidate headers present in the export, in preference order.
+    Each row uses the first of them with a value; empty means no matching column.
+    """
+    ticker: Tuple[int, ...]
+    trans_date: Tuple[int, ...]
+    amount: Tuple[int, ...]
+    description: Tuple[int, ...]
+    action: Tuple[int, ...]
+    currency: Tuple[int, ...]
@@ -0,0 +1,26 @@
+from array import array
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass(frozen=True, slots=True)
+class DividendColumns:
+    """
+    The splits of every dividend transaction in a ledger, stored column-wise
+    (one entry per split, the 'Dividend' split itself excluded):
+    - postdate: date ordinal of the transaction
+    - security: number of the account holding the transaction's 'Dividend' split
+    - account: number of the split's account
+    - cents: split value in hundredths, rounded
+
+    Account numbers index account_ids. Every column is an array('q'), so NumPy
+    can view it without copying.
+    """
+    account_ids: List[str]
+    postdate: array
+    security: array
+    account: array
+    cents: array
+
+    def __len__(self) -> int:
+        return len(self.postdate)
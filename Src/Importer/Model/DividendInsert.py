@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+from Importer.Model.DividendRow import DividendRow
+
+
+@dataclass(frozen=True, slots=True)
+class DividendInsert:
+    """
+    One dividend row resolved to the accounts its transaction splits across.
+    """
+    row: DividendRow
+    cash_account_id: str
+    security_account_id: str
+    income_account_id: str
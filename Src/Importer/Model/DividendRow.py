@@ -3,11 +3,11 @@ from datetime import date
 from decimal import Decimal
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DividendRow:
+    # Readers intern ticker and currency: large imports repeat the same few values
     ticker: str
     trans_date: date
     amount: Decimal
     description: str
     currency: str = "CAD"
-
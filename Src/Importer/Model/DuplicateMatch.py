@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+from Importer.Model.DividendRow import DividendRow
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateMatch:
+    """
+    A row skipped as a duplicate, and the ledger transaction it matched.
+    days_apart is the postdate difference (0 for an exact match).
+    """
+    row: DividendRow
+    transaction_id: str
+    days_apart: int
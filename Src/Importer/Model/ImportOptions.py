@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from Importer.KmymoneyFileIO import KmymoneyFileIO
+
+
+@dataclass(frozen=True)
+class ImportOptions:
+    # Save: stream the original bytes and write only the new transactions
+    splice: bool = False
+    # Applies when the ledger is a gzip-compressed .kmy file
+    compression_level: int = KmymoneyFileIO.DEFAULT_COMPRESSION_LEVEL
+    # Keep a KmymoneyIndexCache sidecar; while it is valid the XML is only parsed when needed
+    use_index_cache: bool = False
+    # ImportStateStore file: skip rows at or before each portfolio's watermark from earlier runs
+    state_path: Optional[str] = None
+    # > 1 parses input files in a process pool; rows are still applied serially, in input order
+    workers: int = 1
+    # KmymoneyXml tree implementation: auto, lxml or stdlib
+    xml_backend: str = "auto"
+    # Stream the ledger with iterparse instead of building a DOM (always saves with splice)
+    scan_only: bool = False
+    # Append new transactions to the ledger's KmymoneyImportJournal instead of saving it
+    journal: bool = False
+    # > 0 also matches a dividend of the same security, cash account and amount this many days away
+    duplicate_window_days: int = 0
+    # Also time every row's read and duplicate lookup; otherwise only the whole row loop is timed
+    profile_rows: bool = False
@@ -1,4 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from Importer.Model.DuplicateMatch import DuplicateMatch
+from Importer.Model.PortfolioWatermark import PortfolioWatermark
+from Importer.Model.StageTiming import StageTiming
 
 
 @dataclass(frozen=True)
@@ -6,3 +11,12 @@ class ImportResult:
     imported_count: int
     skipped_count: int
     duplicate_count: int
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    # Incremental imports only: rows before or on the previous watermark day that
+    # were already processed, and the watermark this input advanced to
+    already_processed_count: int = 0
+    watermark: Optional[PortfolioWatermark] = None
+    # Ids of the transactions created for this input, in insertion order
+    transaction_ids: List[str] = field(default_factory=list)
+    # Rows skipped as duplicates, with the transaction each one matched
+    duplicate_matches: List[DuplicateMatch] = field(default_factory=list)
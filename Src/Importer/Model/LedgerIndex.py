@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# (postdate ordinal, security account number, cash account number, amount numerator, amount denominator)
+Fingerprint = Tuple[int, int, int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerIndex:
+    """
+    The parts of a ledger the importer needs to skip duplicates and allocate ids.
+
+    Fingerprints are plain int tuples: account ids are numbered by their position in
+    account_ids, and amounts are reduced rationals, so "1220/100" and "61/5" match.
+    commodity_fractions maps currency/security ids to their smallest account fraction.
+    """
+    # Fingerprint -> id of the first transaction carrying it
+    dividend_fingerprints: Dict[Fingerprint, str]
+    account_ids: List[str]
+    max_transaction_number: int
+    commodity_fractions: Dict[str, int]
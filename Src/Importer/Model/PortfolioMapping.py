@@ -4,16 +4,19 @@ from typing import Optional
 
 @dataclass(frozen=True)
 class PortfolioMapping:
+    # ticker_to_security_account_id keys are upper-cased once, when the config is loaded
     name: str
     filename_contains: str
     brokerage_cash_account_id: str
     income_gain_account_id: str
     ticker_to_security_account_id: dict[str, str]
 
-    def match_for_filename(self, csv_filename: str) -> bool:
-        return self.filename_contains.lower() in csv_filename.lower()
-
     def security_account_for_ticker(self, ticker: str) -> Optional[str]:
-        return self.ticker_to_security_account_id.get(ticker.upper())
+        # Exports almost always carry upper-case tickers already; only fold case on a miss
+        account_id = self.ticker_to_security_account_id.get(ticker)
+        if account_id is None:
+            account_id = self.ticker_to_security_account_id.get(ticker.upper())
+
+        return account_id
 
 
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import FrozenSet, Tuple
+
+
+@dataclass(frozen=True)
+class PortfolioWatermark:
+    """
+    How far a portfolio's cumulative export has already been processed.
+
+    Rows dated before last_date are skipped outright. Rows dated exactly on
+    last_date are only skipped if their (ticker, date, amount) fingerprint is
+    listed, since a later export can add more rows for that same day.
+    """
+    last_date: date
+    fingerprints_at_last_date: FrozenSet[Tuple[str, str, str]]
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class SecurityPrice:
+    """
+    One <PRICE> of a <PRICEPAIR>: the price of security_id in currency_id on price_date.
+    """
+    security_id: str
+    currency_id: str
+    price_date: date
+    price: Decimal
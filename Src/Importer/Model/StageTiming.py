@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    seconds: float
+    calls: int
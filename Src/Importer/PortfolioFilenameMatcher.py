@@ -0,0 +1,109 @@
+from __future__ import annotations
+from collections import deque
+from typing import Dict, List, Optional
+
+import logging
+
+from Importer.Model.PortfolioMapping import PortfolioMapping
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioFilenameMatcher:
+    """
+    Aho-Corasick automaton over every portfolio's filename_contains pattern
+    (case-insensitive), built once per config.
+
+    A filename is scanned once whatever the number of portfolios, and the longest
+    matching pattern wins, so "AlainRRSP-Spousal" beats "AlainRRSP". Two different
+    portfolios tied on the longest match are reported as ambiguous instead of
+    silently picking whichever is listed first.
+    """
+
+    def __init__(self, portfolios: List[PortfolioMapping]) -> None:
+        # Node 0 is the root. Per node: goto edges, failure link, and the
+        # portfolios whose pattern ends there (own pattern plus failure chain's)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[PortfolioMapping]] = [[]]
+
+        for portfolio in portfolios:
+            self._add_pattern(portfolio)
+
+        self._link_failures()
+
+    def _add_pattern(self, portfolio: PortfolioMapping) -> None:
+        node = 0
+
+        for ch in portfolio.filename_contains.lower():
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[node][ch] = next_node
+            node = next_node
+
+        self._outputs[node].append(portfolio)
+
+    def _link_failures(self) -> None:
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+
+                link = self._goto[fallback].get(ch, 0)
+                self._fail[child] = link if link != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def matches(self, filename: str) -> List[PortfolioMapping]:
+        """
+        Every portfolio whose pattern occurs in filename, longest pattern first.
+        """
+        found: Dict[int, PortfolioMapping] = {}
+        node = 0
+
+        for ch in filename.lower():
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for portfolio in self._outputs[node]:
+                found.setdefault(id(portfolio), portfolio)
+
+        return sorted(found.values(), key=lambda p: len(p.filename_contains), reverse=True)
+
+    def match(self, filename: str) -> Optional[PortfolioMapping]:
+        """
+        The portfolio with the longest matching pattern, or None.
+        Raises ValueError when several portfolios tie for the longest match.
+        """
+        candidates = self.matches(filename)
+        if not candidates:
+            return None
+
+        longest = len(candidates[0].filename_contains)
+        tied = [p for p in candidates if len(p.filename_contains) == longest]
+        if len(tied) > 1:
+            raise ValueError(
+                f"Input filename {filename} matches several portfolios equally "
+                f"({', '.join(p.name for p in tied)}). Make filename_contains more specific in config.json."
+            )
+
+        if len(candidates) > 1:
+            logger.debug(
+                "%s also matches %s; using %s (longest filename_contains)",
+                filename,
+                ", ".join(p.name for p in candidates[1:]),
+                candidates[0].name,
+            )
+
+        return candidates[0]
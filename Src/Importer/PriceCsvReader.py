@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from Importer.DividendCsvReader import DividendCsvReader
+
+
+class PriceCsvReader(DividendCsvReader):
+    """
+    Reads a price history CSV (one row per ticker and day) through the dividend
+    CSV parsing. Each DividendRow's amount is the price:
+    - ticker/symbol: "Symbol" or "Ticker"
+    - date: "Date" (or the dividend date headers)
+    - price: "Close", "Price" or "Adj Close"
+    - currency: "Currency" when present
+    """
+
+    DATE_HEADERS = ["Date", "Transaction Date", "Settlement Date"]
+    AMOUNT_HEADERS = ["Close", "Price", "Adj Close", "close", "price"]
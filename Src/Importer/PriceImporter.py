@@ -0,0 +1,109 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+
+import logging
+
+from Importer.DividendReaderFactory import DividendReaderFactory
+from Importer.ImportProfiler import ImportProfiler
+from Importer.KmymoneyLedgerLock import KmymoneyLedgerLock
+from Importer.KmymoneyXml import KmymoneyXml
+from Importer.Model.BatchImportResult import BatchImportResult
+from Importer.Model.ImportOptions import ImportOptions
+from Importer.Model.ImportResult import ImportResult
+from Importer.Model.SecurityPrice import SecurityPrice
+
+logger = logging.getLogger(__name__)
+
+
+class PriceImporter:
+    """
+    Imports downloaded price histories into the ledger's <PRICES> section.
+
+    Inputs go through DividendReaderFactory's price readers (same CSV/XLSX handling
+    as dividend exports). Tickers are resolved against the ledger's <SECURITIES>
+    symbols, and each security is priced in its trading currency. Result counts:
+    imported (new prices), skipped (ticker not in the ledger, or unparseable row),
+    duplicate (a price for that security and day already exists).
+    """
+
+    def import_many(
+        self,
+        *,
+        xml_path: str,
+        input_paths: List[str],
+        out_path: str,
+        options: Optional[ImportOptions] = None,
+    ) -> BatchImportResult:
+        """
+        Parses the ledger once, inserts every input's prices in bulk and saves once.
+        Prices live outside <TRANSACTIONS>, so the save is always a full one and
+        only the ledger options of ImportOptions (compression, backend) apply.
+        """
+        options = options if options is not None else ImportOptions()
+        profiler = ImportProfiler()
+
+        with profiler.measure("ledger_load"):
+            kmymoney = KmymoneyXml(
+                xml_path,
+                compression_level=options.compression_level,
+                backend=options.xml_backend,
+            )
+            securities = kmymoney.securities_by_symbol()
+
+        results_by_input: Dict[str, ImportResult] = {}
+        for input_path in input_paths:
+            results_by_input[input_path] = self._import_file(kmymoney, input_path, securities)
+
+        with KmymoneyLedgerLock(out_path), profiler.measure("save"):
+            kmymoney.save(out_path)
+
+        return BatchImportResult(results_by_input=results_by_input, timings=profiler.timings())
+
+    def _import_file(
+        self,
+        kmymoney: KmymoneyXml,
+        input_path: str,
+        securities: Dict[str, Tuple[str, Optional[str]]],
+    ) -> ImportResult:
+        profiler = ImportProfiler()
+        reader = DividendReaderFactory.create_for_path(input_path, prices=True)
+
+        prices: List[SecurityPrice] = []
+        unknown_tickers: Set[str] = set()
+        skipped_count = 0
+
+        # Mapping a row is a dict lookup, so the loop is timed as a whole rather than per row
+        with profiler.measure("read"):
+            for row in reader.iter_rows(input_path):
+                security = securities.get(row.ticker)
+                if security is None:
+                    unknown_tickers.add(row.ticker)
+                    skipped_count += 1
+                    continue
+
+                security_id, trading_currency = security
+                prices.append(
+                    SecurityPrice(
+                        security_id=security_id,
+                        currency_id=trading_currency or row.currency,
+                        price_date=row.trans_date,
+                        price=row.amount,
+                    )
+                )
+
+        if unknown_tickers:
+            logger.warning(
+                "%s: no <SECURITY> with symbol %s in the ledger; their prices were skipped",
+                input_path,
+                ", ".join(sorted(unknown_tickers)),
+            )
+
+        with profiler.measure("insert"):
+            added = kmymoney.add_prices(prices)
+
+        return ImportResult(
+            imported_count=len(added),
+            skipped_count=skipped_count,
+            duplicate_count=len(prices) - len(added),
+            timings=profiler.timings(),
+        )
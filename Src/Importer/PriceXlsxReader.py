@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from Importer.DividendXlsxReader import DividendXlsxReader
+
+
+class PriceXlsxReader(DividendXlsxReader):
+    """
+    XLSX counterpart of PriceCsvReader: each DividendRow's amount is the price.
+    """
+
+    DATE_HEADERS = ["Date", "Transaction Date", "Settlement Date"]
+    AMOUNT_HEADERS = ["Close", "Price", "Adj Close", "close", "price"]
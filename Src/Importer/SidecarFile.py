@@ -0,0 +1,81 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+import hashlib
+import logging
+import os
+
+from Importer.KmymoneyFileIO import KmymoneyFileIO
+
+logger = logging.getLogger(__name__)
+
+
+class SidecarFile:
+    """
+    Shared rules for the caches kept next to a source file (ledger or config):
+    - signature() records the source's size, mtime and SHA-256 in the sidecar, or
+      returns None when the source is no longer the file the cached data was built from
+    - is_current() trusts a sidecar only while all three still match; size/mtime are
+      compared first so the (streamed) hash only runs when they agree
+    - write() replaces the sidecar atomically, so readers never see a partial one
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    @staticmethod
+    def signature(
+        source_path: str,
+        *,
+        expected_stat: Optional[Tuple[int, int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        expected_stat is the (size, mtime_ns) the source had before the cached data was
+        built from it; the source must still have it, and keep it while being hashed.
+        """
+        stat = SidecarFile.stat_signature(source_path)
+        if expected_stat is not None and stat != expected_stat:
+            return None
+
+        sha256 = SidecarFile.hash_file(source_path)
+        if SidecarFile.stat_signature(source_path) != stat:
+            return None
+
+        return {"size": stat[0], "mtime_ns": stat[1], "sha256": sha256}
+
+    @staticmethod
+    def stat_signature(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def is_current(raw: Mapping[str, Any], source_path: str, *, description: str) -> bool:
+        size, mtime_ns = SidecarFile.stat_signature(source_path)
+        if raw.get("size") != size or raw.get("mtime_ns") != mtime_ns:
+            logger.info("%s for %s is stale (size/mtime changed)", description, source_path)
+            return False
+
+        if raw.get("sha256") != SidecarFile.hash_file(source_path):
+            logger.info("%s for %s is stale (content changed)", description, source_path)
+            return False
+
+        return True
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(SidecarFile.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    @contextmanager
+    def write(sidecar_path: str) -> Iterator[str]:
+        """
+        Yields the temp path to write; it replaces sidecar_path when the block succeeds.
+        """
+        with KmymoneyFileIO.replace_atomically(sidecar_path, prefix=".importer-sidecar-") as tmp_path:
+            yield tmp_path
@@ -1,35 +1,320 @@
+from decimal import Decimal
+from typing import Any, Dict, List
+
 from Importer.AppConfig import AppConfig
+from Importer.DividendAnalytics import DividendAnalytics
 from Importer.DividendImporter import DividendImporter
+from Importer.DividendWatcher import DividendWatcher
+from Importer.KmymoneyFileIO import KmymoneyFileIO
+from Importer.KmymoneyImportJournal import KmymoneyImportJournal
+from Importer.Model.BatchImportResult import BatchImportResult
+from Importer.Model.ImportOptions import ImportOptions
+from Importer.Model.StageTiming import StageTiming
+from Importer.PriceImporter import PriceImporter
 
 import argparse
+import json
+import logging
+
+
+def _timings_as_dict(timings: Dict[str, StageTiming]) -> Dict[str, Dict[str, Any]]:
+    return {
+        stage: {"seconds": timing.seconds, "calls": timing.calls}
+        for stage, timing in timings.items()
+    }
+
+
+def _report_profile(batch_result: BatchImportResult, destination: str) -> None:
+    """
+    Prints the per-stage breakdown, or writes it as JSON when destination is a path.
+    """
+    if destination != "-":
+        profile = {
+            "ledger": _timings_as_dict(batch_result.timings),
+            "inputs": {
+                input_path: _timings_as_dict(result.timings)
+                for input_path, result in batch_result.results_by_input.items()
+            },
+        }
+
+        with open(destination, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+
+        print(f"Profile: {destination}")
+        return
+
+    print("Profile:")
+    for stage, timing in batch_result.timings.items():
+        print(f"  {stage:<12} {timing.seconds:>10.4f}s  {timing.calls:>8} call(s)")
+
+    for input_path, result in batch_result.results_by_input.items():
+        print(f"  [{input_path}]")
+        for stage, timing in result.timings.items():
+            print(f"    {stage:<10} {timing.seconds:>10.4f}s  {timing.calls:>8} call(s)")
+
+
+def _print_report(analytics: DividendAnalytics, group_by: List[str]) -> None:
+    totals = analytics.totals(group_by)
+    widths = [
+        max([len(name)] + [len(key[i]) for key, _ in totals])
+        for i, name in enumerate(group_by)
+    ]
+
+    print("  ".join(name.ljust(width) for name, width in zip(group_by, widths)) + "  total")
+    for key, cents in totals:
+        print("  ".join(part.ljust(width) for part, width in zip(key, widths)) + f"  {Decimal(cents).scaleb(-2)}")
 
 
 def main() -> None:
     """
     Example usage:
       python main.py --xml financesBefore.xml --csv test__AlainRRSP.csv.txt --config config.json --out financesUpdated.xml
+      python main.py --xml finances.xml --input data/AlainRRSP.xlsx data/AlainTFSA.xlsx --config config.json --out finances.xml
+      python main.py --xml finances.xml --input data/ --config config.json --out finances.xml
+      python main.py --xml finances.xml --input "data/*.xlsx" --config config.json --out finances.xml
+      python main.py --xml finances.xml --watch downloads/ --config config.json --out finances.xml
+      python main.py --xml finances.xml --input data/ --config config.json --out finances.xml --journal
+      python main.py --xml finances.xml --compact --config config.json --out finances.xml
+      python main.py --xml finances.xml --report --group-by portfolio year --config config.json
+      python main.py --xml finances.xml --input prices/ --prices --config config.json --out finances.xml
     """
 
     parser = argparse.ArgumentParser(description="Import dividend rows into KMyMoney XML.")
-    parser.add_argument("--xml", required=True, help="Path to KMyMoney XML file (input)")
-    parser.add_argument("--input", required=True, help="Path to dividend input file (.csv, .csv.txt, .xlsx)")
+    parser.add_argument("--xml", required=True, help="Path to KMyMoney file (input, plain .xml or gzip .kmy)")
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        action="extend",
+        help="Dividend input file(s) (.csv, .csv.txt, .xlsx), directories or glob patterns",
+    )
     parser.add_argument("--config", required=True, help="Path to config.json")
-    parser.add_argument("--out", required=True, help="Path to output XML file")
+    parser.add_argument(
+        "--config-cache",
+        action="store_true",
+        help="Reuse a prebuilt copy of the config kept next to it (<config>.cache.pickle) until config.json changes",
+    )
+    parser.add_argument("--out", help="Path to output XML file (not used by --report)")
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Instead of --input: keep running, import new exports dropped in DIR and checkpoint the ledger to --out",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Instead of --input: write the transactions waiting in the ledger's journal into --out",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Instead of --input: print dividend totals from the ledger for the configured portfolios",
+    )
+    parser.add_argument(
+        "--group-by",
+        nargs="+",
+        choices=DividendAnalytics.GROUP_KEYS,
+        default=list(DividendAnalytics.GROUP_KEYS),
+        help="--report: columns to total by",
+    )
+    parser.add_argument(
+        "--prices",
+        action="store_true",
+        help="--input files are price histories (Date, Symbol, Close): import them into the ledger's PRICES",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Append new transactions to a journal next to the ledger instead of rewriting it (see --compact)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="--watch: how often DIR and the ledger are checked for changes",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="--watch: write the ledger once no new file was imported for this long",
+    )
+    parser.add_argument(
+        "--duplicate-window",
+        type=int,
+        default=0,
+        metavar="DAYS",
+        help="Also treat a dividend with the same security, account and amount up to DAYS away as already imported",
+    )
+    parser.add_argument(
+        "--splice",
+        action="store_true",
+        help="Stream the original XML through and only insert new transactions (no full re-serialization)",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Stream the ledger with iterparse instead of loading it as a tree (implies --splice)",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(0, 10),
+        default=KmymoneyFileIO.DEFAULT_COMPRESSION_LEVEL,
+        metavar="0-9",
+        help="gzip level used when writing back a compressed .kmy file",
+    )
+    parser.add_argument(
+        "--index-cache",
+        action="store_true",
+        help="Keep a sidecar index next to the ledger so re-runs can skip parsing it",
+    )
+    parser.add_argument(
+        "--state",
+        metavar="STATE_JSON",
+        help="Incremental mode: per-portfolio watermark file; rows already processed by earlier runs are skipped",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse up to this many input files in parallel processes (ledger updates stay serial)",
+    )
+    parser.add_argument(
+        "--xml-backend",
+        choices=["auto", "lxml", "stdlib"],
+        default="auto",
+        help="XML implementation for the ledger; auto uses lxml when installed",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="JSON_PATH",
+        help="Print the per-stage timing breakdown, or write it as JSON to JSON_PATH",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="INFO",
+        help="DEBUG also logs every skipped and added row",
+    )
     args = parser.parse_args()
 
-    cfg = AppConfig.load(args.config)
-    importer = DividendImporter(cfg)
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
+
+    if [args.input is not None, args.watch is not None, args.compact, args.report].count(True) != 1:
+        parser.error("Exactly one of --input, --watch, --compact or --report is required")
+    if args.out is None and not args.report:
+        parser.error("--out is required")
+    if args.watch is not None:
+        # The watcher applies each file to the resident ledger and checkpoints it; none of these apply
+        unsupported = [
+            flag for flag, given in (
+                ("--state", args.state is not None),
+                ("--journal", args.journal),
+                ("--workers", args.workers != 1),
+                ("--prices", args.prices),
+            )
+            if given
+        ]
+        if unsupported:
+            parser.error(f"--watch cannot be combined with {', '.join(unsupported)}")
 
-    result = importer.import_dividends(
-        xml_path=args.xml,
-        input_path=args.input,
-        out_path=args.out,
+    cfg = AppConfig.load(args.config, use_cache=args.config_cache)
+    importer = DividendImporter(cfg)
+    options = ImportOptions(
+        splice=args.splice,
+        compression_level=args.compression_level,
+        use_index_cache=args.index_cache,
+        state_path=args.state,
+        workers=args.workers,
+        xml_backend=args.xml_backend,
+        scan_only=args.scan,
+        journal=args.journal,
+        duplicate_window_days=args.duplicate_window,
+        profile_rows=args.profile is not None,
     )
 
-    print(f"Imported: {result.imported_count}")
-    print(f"Skipped (no mapping / invalid): {result.skipped_count}")
-    print(f"Skipped (already exists): {result.duplicate_count}")
-    print(f"Output: {args.out}")
+    if args.report:
+        _print_report(
+            DividendAnalytics(
+                DividendAnalytics.load_columns(args.xml, use_cache=args.index_cache, xml_backend=args.xml_backend),
+                cfg.portfolios,
+            ),
+            args.group_by,
+        )
+        return
+
+    if args.watch is not None:
+        watcher = DividendWatcher(
+            importer,
+            watch_dir=args.watch,
+            xml_path=args.xml,
+            out_path=args.out,
+            options=options,
+            poll_interval=args.poll_interval,
+            debounce=args.debounce,
+        )
+        watcher.run()
+        return
+
+    if args.compact:
+        result = importer.compact_journal(xml_path=args.xml, out_path=args.out, options=options)
+        print(f"Compacted: {result.imported_count}")
+        print(f"Skipped (already exists): {result.duplicate_count}")
+        print(f"Output: {args.out}")
+        return
+
+    input_paths = DividendImporter.expand_input_paths(args.input)
+    if not input_paths:
+        parser.error(f"No dividend input files found for: {' '.join(args.input)}")
+
+    if args.prices:
+        batch_result = PriceImporter().import_many(
+            xml_path=args.xml,
+            input_paths=input_paths,
+            out_path=args.out,
+            options=options,
+        )
+    else:
+        batch_result = importer.import_many(
+            xml_path=args.xml,
+            input_paths=input_paths,
+            out_path=args.out,
+            options=options,
+        )
+
+    for input_path, result in batch_result.results_by_input.items():
+        print(f"[{input_path}]")
+        print(f"  Imported: {result.imported_count}")
+        if result.transaction_ids:
+            print(f"  Transactions: {result.transaction_ids[0]} .. {result.transaction_ids[-1]}")
+        print(f"  Skipped (no mapping / invalid): {result.skipped_count}")
+        print(f"  Skipped (already exists): {result.duplicate_count}")
+        for match in result.duplicate_matches:
+            if match.days_apart:
+                print(
+                    f"    {match.row.ticker} {match.row.trans_date} {match.row.amount} "
+                    f"matched {match.transaction_id} ({match.days_apart:+d} day(s))"
+                )
+        if args.state:
+            print(f"  Skipped (processed by a previous run): {result.already_processed_count}")
+
+    total = batch_result.total
+    print(f"Imported: {total.imported_count}")
+    print(f"Skipped (no mapping / invalid): {total.skipped_count}")
+    print(f"Skipped (already exists): {total.duplicate_count}")
+    if args.state:
+        print(f"Skipped (processed by a previous run): {total.already_processed_count}")
+    if args.journal:
+        print(f"Journal: {KmymoneyImportJournal(args.xml).path}")
+    else:
+        print(f"Output: {args.out}")
+
+    if args.profile is not None:
+        _report_profile(batch_result, args.profile)
 
 
 if __name__ == "__main__":